@@ -1,84 +1,72 @@
 import pygame
 import math
 import random
-import os
-import sys
-from pygame import gfxdraw  # 用于绘制抗锯齿图形
-from enum import Enum
-
-# 设置 UTF-8 编码
-pygame.init()
-pygame.font.init()
-
-# 尝试加载中文字体
-def get_chinese_font(size):
-    try:
-        # Windows 系统字体路径
-        font_paths = [
-            "C:\\Windows\\Fonts\\msyh.ttc",  # 微软雅黑
-            "C:\\Windows\\Fonts\\simhei.ttf",  # 黑体
-            "C:\\Windows\\Fonts\\simsun.ttc",  # 宋体
-        ]
-        
-        # 尝试加载系统字体
-        for path in font_paths:
-            if os.path.exists(path):
-                return pygame.font.Font(path, size)
-        
-        # 如果找不到系统字体，尝试使用 pygame 默认中文字体
-        return pygame.font.SysFont('microsoftyahei', size)
-    except:
-        # 如果都失败了，使用默认字体
-        return pygame.font.Font(None, size)
-
-# 设置窗口
-WINDOW_WIDTH = 1920
-WINDOW_HEIGHT = 1080
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("球类对战游戏")
-
-# 获取系统字体路径
-def get_font_path():
-    if sys.platform.startswith('win'):
-        # Windows系统字体路径
-        font_paths = [
-            "C:\\Windows\\Fonts\\msyh.ttc",  # 微软雅黑
-            "C:\\Windows\\Fonts\\simhei.ttf",  # 黑体
-            "C:\\Windows\\Fonts\\simsun.ttc",  # 宋体
-        ]
-        for path in font_paths:
-            if os.path.exists(path):
-                return path
-    return None
-
-# 创建字体对象
-def create_font(size):
-    font_path = get_font_path()
+import argparse
+import contextlib
+import time
+
+import replay
+import simulation
+from dirty_rects import DirtyRectTracker
+from events import EventBus, ConsoleSink, AsyncFileSink, LEVELS, DEBUG, INFO
+from fonts import FontRegistry
+from profiler import FrameProfiler
+from quality import QualityGovernor, QUALITY_NAMES
+from render_cache import SurfaceCache, TextCache
+from render_target import RenderTarget, AdaptiveResolution, scaled
+from simulation_loop import SimulationLoop
+from simulation import (
+    WINDOW_WIDTH, WINDOW_HEIGHT,
+    WHITE, BLACK, RED,
+    ARROW_LENGTH_MIN, ARROW_LENGTH_MAX,
+    PowerUpType,
+)
+
+# 导入本模块不初始化 pygame、不打开窗口：窗口由 init() 创建，字体在首次绘制时加载
+# 启动各阶段的耗时（秒），main() 在第一帧之后打印
+startup_times = {}
+
+@contextlib.contextmanager
+def startup_stage(name):
+    """记录一个启动阶段的耗时，同名阶段累加"""
+    start = time.perf_counter()
     try:
-        if font_path:
-            return pygame.font.Font(font_path, size)
-        else:
-            # 如果找不到系统字体，尝试使用系统默认中文字体
-            return pygame.font.SysFont('microsoftyahei', size)
-    except:
-        # 如果都失败了，使用默认字体
-        return pygame.font.Font(None, size)
-
-# 颜色定义
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-BLUE = (0, 0, 255)
-GREEN = (0, 255, 0)
-GRAY = (128, 128, 128)
-
-# 球的属性
-BALL_RADIUS = 25
-ARROW_LENGTH_MIN = 30
-ARROW_LENGTH_MAX = 100
-POWER_CHANGE_SPEED = 2
-FRICTION = 0.98
-ROTATION_SPEED = 3
+        yield
+    finally:
+        startup_times[name] = startup_times.get(name, 0.0) + time.perf_counter() - start
+
+def startup_report():
+    """启动各阶段耗时的一行摘要"""
+    return ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in startup_times.items())
+
+screen = None  # 游戏窗口，由 init() 创建
+vsync_enabled = False  # 窗口是否开启了垂直同步
+FALLBACK_FPS = 144  # 没有垂直同步时默认的渲染帧率上限
+ADAPTIVE_MIN_SCALE = 0.5  # 动态分辨率的最低内部分辨率比例
+
+def init(vsync=False):
+    """初始化 pygame 的显示和字体模块并创建窗口，返回窗口 surface；重复调用直接返回已有窗口
+
+    vsync 为 True 时尝试开启垂直同步，驱动不支持时退回普通窗口；垂直同步需要 SCALED 窗口，
+    窗口内容会按桌面缩放比例放大，窗口大小和全屏切换的行为与普通窗口不同，因此默认不开启
+    """
+    global screen, vsync_enabled
+    if screen is None:
+        with startup_stage('pygame'):
+            # 只初始化用到的模块，不启动音频等其他子系统
+            pygame.display.init()
+            pygame.font.init()
+        with startup_stage('window'):
+            if vsync:
+                try:
+                    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED, vsync=1)
+                    vsync_enabled = True
+                except pygame.error:
+                    screen = None
+            if screen is None:
+                screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption("球类对战游戏")
+    return screen
 
 # 添加更多颜色定义
 COLORS = {
@@ -92,91 +80,67 @@ COLORS = {
     'power_bar': (46, 204, 113)     # 力量条颜色
 }
 
-# 定义道具类型
-class PowerUpType(Enum):
-    SPEED_UP = "加快旋转"     # 坏球 - 红色
-    SPEED_DOWN = "减慢旋转"   # 好球 - 绿色
-    POWER_UP = "增加强度"     # 好球 - 绿色
-    POWER_DOWN = "减小强度"   # 坏球 - 红色
-    SIZE_UP = "增大球体"      # 坏球 - 红色
-    SIZE_DOWN = "缩小球体"    # 好球 - 绿色
-    RESET_POSITION = "回到起点" # 中性 - 黑色
-    RANDOM = "随机效果"       # 神秘 - 白色带黑边
+# 箭头精灵缓存：按量化后的角度、力量和模式（瞄准/调整力量）缓存预合成的箭头
+ARROW_ANGLE_STEP = 1  # 角度量化步长（度）
+arrow_cache = SurfaceCache(max_bytes=16 * 1024 * 1024)
+
+# 字体注册表：中文字体路径只查找一次，字体按（路径，字号）在整个进程内共享，首次使用时加载
+font_registry = FontRegistry()
+
+# 文字缓存：按（字体，字符串，颜色，抗锯齿）缓存渲染好的文字
+text_cache = TextCache(max_bytes=8 * 1024 * 1024, max_entries=512)
+
+# 画质等级：绘制耗时超出预算时依次关闭道具脉动、箭头渐变和半透明面板，有余量时恢复
+quality = QualityGovernor()
+
+# 分阶段帧计时：F3 显示/隐藏计时图表，F4 导出 JSON
+profiler = FrameProfiler()
+# 图表中堆叠显示的主循环阶段及颜色
+PROFILER_PHASES = [
+    ('events', (149, 165, 166)),
+    ('update', (65, 105, 225)),
+    ('draw', (46, 204, 113)),
+    ('present', (230, 126, 34)),
+]
+PROFILER_PANEL = pygame.Rect(20, WINDOW_HEIGHT - 260, 520, 240)  # 计时图表的位置
+PROFILER_GRAPH_MS = 33.3  # 图表满高对应的毫秒数
+
+class Obstacle(simulation.Obstacle):
+    __slots__ = ()
 
-class Obstacle:
-    def __init__(self, x, y, width, height):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.color = (100, 100, 100)  # 障碍物颜色
-        
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
         # 添加边缘效果
         pygame.draw.rect(screen, (80, 80, 80), self.rect, 2)
 
-class PowerUp:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.type = random.choice(list(PowerUpType))  # 随机选择任意效果
-        self.is_mystery = random.random() < 0.3  # 30%概率是问号球
-        
-        # 设置基础属性
-        self.radius = 15
-        self.color = (255, 255, 255)
-        self.outline_color = (0, 0, 0)
-        self.lifetime = 45000
-        self.collected = False
-        self.font = create_font(14)
-        self.creation_time = pygame.time.get_ticks()
-        
-        # 根据效果类型设置特定属性
-        if self.is_mystery:
-            # 问号球：白色带黑边
-            self.color = (255, 255, 255)
-            self.outline_color = (0, 0, 0)
-            self.radius = random.randint(15, 20)
-            self.lifetime = random.randint(40000, 50000)
-        else:
-            if self.type in [PowerUpType.SPEED_UP, PowerUpType.POWER_DOWN, PowerUpType.SIZE_UP]:
-                # 负面效果：红色，大球
-                self.color = (255, 80, 80)
-                self.outline_color = (255, 80, 80)
-                self.radius = random.randint(20, 25)
-                self.lifetime = random.randint(50000, 60000)
-            elif self.type in [PowerUpType.SPEED_DOWN, PowerUpType.POWER_UP, PowerUpType.SIZE_DOWN]:
-                # 正面效果：绿色，小球
-                self.color = (80, 255, 80)
-                self.outline_color = (80, 255, 80)
-                self.radius = random.randint(12, 15)
-                self.lifetime = random.randint(30000, 40000)
-            elif self.type == PowerUpType.RESET_POSITION:
-                # 重置位置：黑色，中等大小
-                self.color = (50, 50, 50)
-                self.outline_color = (50, 50, 50)
-                self.radius = random.randint(15, 18)
-                self.lifetime = random.randint(40000, 50000)
+class PowerUp(simulation.PowerUp):
+    __slots__ = ()
 
-    def draw(self, screen):
+    @property
+    def font(self):
+        return font_registry.chinese(14)
+
+    def draw(self, screen, scale=1.0):
+        """绘制道具；scale 为内部分辨率相对世界坐标的比例"""
         if self.collected:
             return
             
-        # 脉动效果
-        pulse = math.sin(pygame.time.get_ticks() * 0.005) * 2
-        actual_radius = self.radius + pulse
+        # 脉动效果（画质降低时关闭）
+        pulse = self.get_pulse()
+        actual_radius = int((self.radius + pulse) * scale)
+        center = (int(self.x * scale), int(self.y * scale))
+        font = self.font if scale == 1.0 else font_registry.chinese(scaled(14, scale))
         
         # 设置默认文字
         text = "?"
         
         if self.is_mystery:
             # 问号球：白色填充 + 黑色边框
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 
-                             int(actual_radius))
-            pygame.draw.circle(screen, self.outline_color, (int(self.x), int(self.y)), 
-                             int(actual_radius), 2)
+            pygame.draw.circle(screen, self.color, center, actual_radius)
+            pygame.draw.circle(screen, self.outline_color, center, actual_radius, scaled(2, scale))
         else:
             # 其他球：实心填充
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 
-                             int(actual_radius))
+            pygame.draw.circle(screen, self.color, center, actual_radius)
             # 根据效果类型设置文字
             if self.type == PowerUpType.SPEED_UP:
                 text = "快"
@@ -196,502 +160,98 @@ class PowerUp:
                 text = "?"
         
         # 绘制文字
-        text_surface = self.font.render(text, True, 
-                                      self.outline_color if self.is_mystery else (255, 255, 255))
-        text_rect = text_surface.get_rect(center=(self.x, self.y))
+        text_surface = text_cache.render(font, text,
+                                         self.outline_color if self.is_mystery else (255, 255, 255))
+        text_rect = text_surface.get_rect(center=(self.x * scale, self.y * scale))
         screen.blit(text_surface, text_rect)
         
         # 显示剩余时间
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         remaining_time = (self.lifetime - (current_time - self.creation_time)) // 1000
         if remaining_time <= 5:
-            time_text = self.font.render(str(remaining_time), True, 
-                                       self.outline_color if self.is_mystery else (255, 255, 255))
-            time_rect = time_text.get_rect(center=(self.x, self.y - self.radius - 15))
+            time_text = text_cache.render(font, str(remaining_time),
+                                          self.outline_color if self.is_mystery else (255, 255, 255))
+            time_rect = time_text.get_rect(center=(self.x * scale, (self.y - self.radius - 15) * scale))
             screen.blit(time_text, time_rect)
 
-class AI:
-    def __init__(self):
-        self.difficulty = "normal"  # easy, normal, hard
-        self.accuracy = 0.8  # 命中率基准
-        self.min_power = ARROW_LENGTH_MIN
-        self.max_power = ARROW_LENGTH_MAX
+    def get_pulse(self):
+        """脉动动画当前的半径增量"""
+        if not quality.enabled('pulse'):
+            return 0
+        return math.sin(self.clock.get_ticks() * 0.005) * 2
 
-    def calculate_shot(self, computer_ball, player_ball):
-        """计算最佳射击角度和力量"""
-        dx = player_ball.x - computer_ball.x
-        dy = player_ball.y - computer_ball.y
-        distance = math.sqrt(dx*dx + dy*dy)
-        
-        # 基础角度计算
-        base_angle = math.degrees(math.atan2(dy, dx))
-        
-        # 根据难度添加随机偏移
-        if self.difficulty == "easy":
-            angle_offset = random.uniform(-20, 20)
-            self.accuracy = 0.6
-        elif self.difficulty == "normal":
-            angle_offset = random.uniform(-10, 10)
-            self.accuracy = 0.8
-        else:  # hard
-            angle_offset = random.uniform(-5, 5)
-            self.accuracy = 0.95
-
-        # 计算最终角度
-        final_angle = base_angle + angle_offset
-        
-        # 计��力量
-        ideal_power = min(distance / 5, self.max_power)
-        power_variation = ideal_power * (1 - self.accuracy)
-        final_power = ideal_power + random.uniform(-power_variation, power_variation)
-        final_power = max(self.min_power, min(final_power, self.max_power))
-        
-        return final_angle, final_power
-
-    def predict_collision(self, ball1_pos, ball2_pos, velocity, angle):
-        """预测是否会发生碰撞"""
-        future_x = ball1_pos[0] + math.cos(math.radians(angle)) * velocity
-        future_y = ball1_pos[1] + math.sin(math.radians(angle)) * velocity
-        
-        distance = math.sqrt((future_x - ball2_pos[0])**2 + (future_y - ball2_pos[1])**2)
-        return distance < BALL_RADIUS * 2
+    def get_draw_signature(self):
+        """决定外观的状态，不变时无需重绘"""
+        pulse = self.get_pulse()
+        remaining_time = (self.lifetime - (self.clock.get_ticks() - self.creation_time)) // 1000
+        return (int(self.radius + pulse), min(remaining_time, 6), self.collected)
 
 class Background:
     def __init__(self, width, height):
         self.width = width
         self.height = height
         self.grid_size = 50
+        self.layer = None  # 预渲染的静态层（背景、网格、装饰、障碍物）
+        self.scaled_layers = {}  # scale -> 缩放到内部分辨率的静态层
+        self.rng = random.Random()  # 装饰图案使用独立的随机数，不影响游戏逻辑
+        
+    def build(self, obstacles):
+        """预渲染静态层，每次生成障碍物后调用一次"""
+        layer = pygame.Surface((self.width, self.height))
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()  # 转为显示格式，之后的 blit 不需要格式转换
         
-    def draw(self, screen):
         # 填充背景色
-        screen.fill(COLORS['background'])
+        layer.fill(COLORS['background'])
         
         # 绘制网格
         for x in range(0, self.width, self.grid_size):
-            pygame.draw.line(screen, COLORS['grid'], (x, 0), (x, self.height))
+            pygame.draw.line(layer, COLORS['grid'], (x, 0), (x, self.height))
         for y in range(0, self.height, self.grid_size):
-            pygame.draw.line(screen, COLORS['grid'], (0, y), (self.width, y))
+            pygame.draw.line(layer, COLORS['grid'], (0, y), (self.width, y))
         
-        # 绘制装饰性圆形
+        # 绘制装饰性圆形（每个布局固定，不再逐帧闪烁）
         for _ in range(20):
-            x = random.randint(0, self.width)
-            y = random.randint(0, self.height)
-            radius = random.randint(5, 20)
-            alpha = random.randint(20, 40)
+            x = self.rng.randint(0, self.width)
+            y = self.rng.randint(0, self.height)
+            radius = self.rng.randint(5, 20)
+            alpha = self.rng.randint(20, 40)
             s = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
             pygame.draw.circle(s, (*COLORS['grid'], alpha), (radius, radius), radius)
-            screen.blit(s, (x-radius, y-radius))
-
-class Game:
-    def __init__(self):
-        # 初始化基本属性
-        self.obstacles = []  # 添加障碍物列表
-        self.power_ups = []  # 道具列表
-        self.last_powerup_time = pygame.time.get_ticks()
-        self.powerup_interval = random.randint(5000, 10000)
-        self.max_power_ups = 10
-        
-        # 使用中文字体
-        self.font = get_chinese_font(36)
-        self.small_font = get_chinese_font(24)
-        
-        # 创建按钮时使用中文字体
-        self.quit_button = Button(WINDOW_WIDTH - 120, 20, 100, 40, "退出", RED, self.small_font)
-        
-        # 创建AI
-        self.ai = AI()
-        
-        # 创建背景
-        self.background = Background(WINDOW_WIDTH, WINDOW_HEIGHT)
-        
-        # 重置游戏状态
-        self.reset_game()
-
-    def reset_game(self):
-        """重置游戏状态"""
-        # 创建玩家和电脑的球
-        self.player_ball = Ball(WINDOW_WIDTH * 0.2, WINDOW_HEIGHT/2, BLUE)
-        self.computer_ball = Ball(WINDOW_WIDTH * 0.8, WINDOW_HEIGHT/2, RED)
-        
-        # 重置游戏状态
-        self.game_over = False
-        self.winner = None
-        self.current_turn = "player"
-        self.computer_state = "waiting"
-        self.computer_aiming_time = 0
-        
-        # 清空并重新生成道具和障碍物
-        self.power_ups.clear()
-        self.obstacles.clear()
-        self.last_powerup_time = pygame.time.get_ticks()
-        self.generate_obstacles()
-
-    def generate_obstacles(self):
-        """生成障碍物"""
-        # 定义安全区域（不生成障碍物的区域）
-        safe_zones = [
-            pygame.Rect(0, WINDOW_HEIGHT/2 - 100, WINDOW_WIDTH * 0.3, 200),  # 左侧安全区
-            pygame.Rect(WINDOW_WIDTH * 0.7, WINDOW_HEIGHT/2 - 100, WINDOW_WIDTH * 0.3, 200)  # 右侧安全区
-        ]
-        
-        # 生成随机数量的障碍物
-        num_obstacles = random.randint(5, 10)
-        for _ in range(num_obstacles):
-            attempts = 0
-            max_attempts = 50  # 最大尝试次数
-            
-            while attempts < max_attempts:
-                width = random.randint(30, 80)
-                height = random.randint(30, 80)
-                x = random.randint(0, WINDOW_WIDTH - width)
-                y = random.randint(0, WINDOW_HEIGHT - height)
-                new_obstacle = pygame.Rect(x, y, width, height)
-                
-                # 检查是否与安全区域重叠
-                if not any(new_obstacle.colliderect(zone) for zone in safe_zones):
-                    # 检查是否与其他障碍物重叠
-                    if not any(new_obstacle.colliderect(obs.rect) for obs in self.obstacles):
-                        self.obstacles.append(Obstacle(x, y, width, height))
-                        break
-                
-                attempts += 1
-
-    def generate_power_up(self):
-        current_time = pygame.time.get_ticks()
-        
-        # 清理已收集或过期的道具
-        active_power_ups = []
-        for power_up in self.power_ups:
-            if not power_up.collected and (current_time - power_up.creation_time) < power_up.lifetime:
-                active_power_ups.append(power_up)
-        self.power_ups = active_power_ups
-        
-        # 如果当前道具数量小于最大值，且达到生成间隔，尝试生成新道具
-        if (len(self.power_ups) < self.max_power_ups and 
-            current_time - self.last_powerup_time >= self.powerup_interval):
-            
-            # 随机决定是否生成新道具（50%概率）
-            if random.random() < 0.5:
-                self.try_generate_new_powerup(current_time)
-            
-            # 无论是否生成成功，都更新最后生成时间和下一个检查间隔
-            self.last_powerup_time = current_time
-            self.powerup_interval = random.randint(5000, 10000)
-
-    def try_generate_new_powerup(self, current_time):
-        """尝试在合适的位置生成新道具"""
-        attempts = 0
-        max_attempts = 10  # 最大尝试次数
-        
-        while attempts < max_attempts:
-            x = random.randint(50, WINDOW_WIDTH - 50)
-            y = random.randint(50, WINDOW_HEIGHT - 50)
-            
-            # 创建检测区域（比实际道具大一些）
-            check_radius = 30
-            
-            # 检查是否与障碍物重叠
-            valid_position = True
-            for obstacle in self.obstacles:
-                if obstacle.rect.collidepoint(x, y):
-                    valid_position = False
-                    break
-            
-            # 检查是否与其他道具太近
-            if valid_position:
-                for power_up in self.power_ups:
-                    if math.hypot(x - power_up.x, y - power_up.y) < check_radius * 2:
-                        valid_position = False
-                        break
-            
-            # 检查是否在玩家或电脑球的范围内
-            if valid_position:
-                for ball in [self.player_ball, self.computer_ball]:
-                    if math.hypot(x - ball.x, y - ball.y) < check_radius + ball.radius:
-                        valid_position = False
-                        break
-            
-            if valid_position:
-                self.power_ups.append(PowerUp(x, y))
-                return True
-            
-            attempts += 1
-        
-        return False
-
-    def check_power_up_collisions(self, ball):
-        """检查球与道具的碰撞并应用效果"""
-        for power_up in self.power_ups:
-            if not power_up.collected:
-                distance = math.hypot(ball.x - power_up.x, ball.y - power_up.y)
-                if distance < ball.radius + power_up.radius:
-                    effect_type = power_up.type
-                    if power_up.is_mystery:
-                        effect_type = PowerUpType.RANDOM
-                    ball.apply_effect(effect_type)
-                    power_up.collected = True
-                    print(f"收集道具: {'随机效果' if power_up.is_mystery else effect_type.value}")
-                    
-                    # 如果是重置位置效果，特殊处理回合
-                    if effect_type == PowerUpType.RESET_POSITION:
-                        if self.current_turn == "player":
-                            self.current_turn = "computer"
-                            self.computer_state = "waiting"
-                            self.player_ball.turn_complete = True
-                            self.computer_ball.turn_complete = False
-                            print("玩家重置位置，回合切换到电脑")
-                        else:
-                            self.current_turn = "player"
-                            self.computer_ball.turn_complete = True
-                            self.player_ball.turn_complete = False
-                            print("电脑重置位置，回合切换到玩家")
-
-    def check_collision(self):
-        dx = self.player_ball.x - self.computer_ball.x
-        dy = self.player_ball.y - self.computer_ball.y
-        distance = math.sqrt(dx*dx + dy*dy)
-        
-        if distance < BALL_RADIUS * 2:
-            if self.player_ball.is_moving:
-                self.winner = "玩家"
-            elif self.computer_ball.is_moving:
-                self.winner = "电脑"
-            self.game_over = True
-
-    def computer_play(self):
-        """改进的电脑AI逻辑"""
-        if self.computer_state == "waiting":
-            self.computer_state = "aiming"
-            self.computer_ball.is_aiming = True
-            self.computer_aiming_time = 0
-            
-            # 计算最佳射击角度和力量
-            target_x = self.player_ball.x
-            target_y = self.player_ball.y
-            
-            # 检查是否有障碍物阻挡
-            dx = target_x - self.computer_ball.x
-            dy = target_y - self.computer_ball.y
-            distance = math.sqrt(dx*dx + dy*dy)
-            
-            # 如果有障碍物，尝试寻找替代路径
-            has_obstacle = False
-            for obstacle in self.obstacles:
-                if self.check_line_obstacle_collision(
-                    self.computer_ball.x, self.computer_ball.y,
-                    target_x, target_y,
-                    obstacle.rect
-                ):
-                    has_obstacle = True
-                    break
-            
-            if has_obstacle:
-                # 寻找替代目标点
-                angles = [a for a in range(0, 360, 30)]  # 每30度检查一个方向
-                random.shuffle(angles)  # 随机化方向
-                for angle in angles:
-                    rad = math.radians(angle)
-                    test_x = self.computer_ball.x + math.cos(rad) * distance
-                    test_y = self.computer_ball.y + math.sin(rad) * distance
-                    if not any(self.check_line_obstacle_collision(
-                        self.computer_ball.x, self.computer_ball.y,
-                        test_x, test_y,
-                        obstacle.rect
-                    ) for obstacle in self.obstacles):
-                        target_x = test_x
-                        target_y = test_y
-                        break
-            
-            # 计算最终角度和力量
-            dx = target_x - self.computer_ball.x
-            dy = target_y - self.computer_ball.y
-            self.target_angle = math.degrees(math.atan2(dy, dx))
-            self.target_power = min(
-                distance * 0.5,  # 根据距离调整力量
-                self.computer_ball.max_power
-            )
-            
-        elif self.computer_state == "aiming":
-            # 平滑转向目标角度
-            angle_diff = (self.target_angle - self.computer_ball.angle) % 360
-            if angle_diff > 180:
-                angle_diff -= 360
-            
-            if abs(angle_diff) > self.computer_ball.rotation_speed:
-                if angle_diff > 0:
-                    self.computer_ball.angle += self.computer_ball.rotation_speed
-                else:
-                    self.computer_ball.angle -= self.computer_ball.rotation_speed
-            else:
-                self.computer_ball.angle = self.target_angle
-                self.computer_aiming_time += 1
-                
-            if self.computer_aiming_time >= 30:
-                self.computer_state = "power"
-                self.computer_ball.is_aiming = False
-                self.computer_ball.is_power_adjusting = True
-                self.computer_aiming_time = 0
-                
-        elif self.computer_state == "power":
-            # 调整到目标力量
-            if abs(self.computer_ball.power - self.target_power) > POWER_CHANGE_SPEED:
-                if self.computer_ball.power < self.target_power:
-                    self.computer_ball.power += POWER_CHANGE_SPEED
-                else:
-                    self.computer_ball.power -= POWER_CHANGE_SPEED
-            else:
-                self.computer_ball.power = self.target_power
-                self.computer_state = "shooting"
-                self.computer_ball.shoot()
-
-    def check_line_obstacle_collision(self, x1, y1, x2, y2, obstacle_rect):
-        """检查线段是否与矩形障碍物相交"""
-        def ccw(A, B, C):
-            return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
-
-        def intersect(A, B, C, D):
-            return ccw(A, C, D) != ccw(B, C, D) and ccw(A, B, C) != ccw(A, B, D)
-
-        # 检查线段是否与矩形的四条边相交
-        rect_points = [
-            (obstacle_rect.left, obstacle_rect.top),
-            (obstacle_rect.right, obstacle_rect.top),
-            (obstacle_rect.right, obstacle_rect.bottom),
-            (obstacle_rect.left, obstacle_rect.bottom)
-        ]
-        
-        line_start = (x1, y1)
-        line_end = (x2, y2)
-        
-        for i in range(4):
-            if intersect(
-                line_start, line_end,
-                rect_points[i], rect_points[(i + 1) % 4]
-            ):
-                return True
-        return False
-
-    def update(self):
-        """更新游戏状态"""
-        self.player_ball.update()
-        self.computer_ball.update()
-        self.check_collision()
-        self.generate_power_up()
-        
-        if not self.game_over:
-            # 处理回合转换
-            if self.current_turn == "player":
-                if self.player_ball.turn_complete:
-                    self.current_turn = "computer"
-                    self.computer_state = "waiting"
-                    self.player_ball.turn_complete = False
-                    # 确保电脑球准备好下一回合
-                    self.computer_ball.is_moving = False
-                    self.computer_ball.turn_complete = False
-                    print("回合切换到电脑")
-            elif self.current_turn == "computer":
-                if not self.computer_ball.is_moving:
-                    self.computer_play()
-                if self.computer_ball.turn_complete:
-                    self.current_turn = "player"
-                    self.computer_ball.turn_complete = False
-                    # 确保玩家球准备好下一回合
-                    self.player_ball.is_moving = False
-                    self.player_ball.turn_complete = False
-                    print("回合切换到玩家")
-
-        # 检查与障碍物和道具的碰撞
-        for ball in [self.player_ball, self.computer_ball]:
-            if ball.is_moving:
-                self.check_obstacle_collisions(ball)
-                self.check_power_up_collisions(ball)
-
-        # 更新球的效果状态
-        self.player_ball.update_effects()
-        self.computer_ball.update_effects()
-
-    def check_obstacle_collisions(self, ball):
-        """检查球与障碍物的碰撞"""
-        ball_rect = pygame.Rect(ball.x - ball.radius, ball.y - ball.radius,
-                              ball.radius * 2, ball.radius * 2)
-        for obstacle in self.obstacles:
-            if ball_rect.colliderect(obstacle.rect):
-                # 确定碰撞方向并反弹
-                if ball.x < obstacle.rect.left or ball.x > obstacle.rect.right:
-                    ball.dx *= -1
-                if ball.y < obstacle.rect.top or ball.y > obstacle.rect.bottom:
-                    ball.dy *= -1
-
-    def draw(self, screen):
-        # 绘制景
-        self.background.draw(screen)
+            layer.blit(s, (x-radius, y-radius))
         
         # 绘制障碍物
-        for obstacle in self.obstacles:
-            obstacle.draw(screen)
-        
-        # 绘制道具
-        current_time = pygame.time.get_ticks()
-        for power_up in self.power_ups:
-            if not power_up.collected:
-                power_up.draw(screen)
-                
-                # 计算并显示剩余时间
-                remaining_time = (power_up.lifetime - 
-                                (current_time - power_up.creation_time)) // 1000
-                
-                # 最后5秒显示计时
-                if remaining_time <= 5:
-                    time_text = self.font.render(str(remaining_time), True, power_up.color)
-                    time_rect = time_text.get_rect(
-                        center=(power_up.x, power_up.y - power_up.radius - 20)
-                    )
-                    screen.blit(time_text, time_rect)
-        
-        # 绘制信息面板
-        panel_surface = pygame.Surface((300, 150), pygame.SRCALPHA)
-        pygame.draw.rect(panel_surface, COLORS['panel'], panel_surface.get_rect())
-        screen.blit(panel_surface, (20, 20))
-        
-        # 显示当前回合
-        turn_text = f"当前回合: {'玩家' if self.current_turn == 'player' else '电脑'}"
-        text_surface = self.font.render(turn_text, True, BLACK)
-        screen.blit(text_surface, (20, 20))
-        
-        # 绘制力量条
-        if self.current_turn == "player" and self.player_ball.is_power_adjusting:
-            power_percentage = (self.player_ball.power - ARROW_LENGTH_MIN) / (ARROW_LENGTH_MAX - ARROW_LENGTH_MIN)
-            power_width = 200 * power_percentage
-            pygame.draw.rect(screen, COLORS['power_bar'], (40, 80, power_width, 20))
-            pygame.draw.rect(screen, COLORS['title'], (40, 80, 200, 20), 2)
-        
-        # 绘制球
-        self.player_ball.draw(screen)
-        self.computer_ball.draw(screen)
-        
-        # 绘制退出按钮
-        self.quit_button.draw(screen)
-        
-        # 游戏结束显示
-        if self.game_over:
-            # 创建半透明遮罩
-            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-            pygame.draw.rect(overlay, (0, 0, 0, 128), overlay.get_rect())
-            screen.blit(overlay, (0, 0))
-            
-            # 显示获胜信息
-            win_text = f"{self.winner}获胜！按空格键重新开始"
-            text_surface = self.font.render(win_text, True, WHITE)
-            text_rect = text_surface.get_rect(center=(WINDOW_WIDTH/2, WINDOW_HEIGHT/2))
-            screen.blit(text_surface, text_rect)
+        for obstacle in obstacles:
+            obstacle.draw(layer)
+        
+        self.layer = layer
+        self.scaled_layers.clear()
+        
+    def draw(self, screen, scale=1.0):
+        # 一次 blit 绘制整个静态层
+        screen.blit(self.get_layer(scale), (0, 0))
+
+    def get_layer(self, scale=1.0):
+        """按内部分辨率缩放的静态层，每个 scale 只缩放一次"""
+        if scale == 1.0:
+            return self.layer
+        layer = self.scaled_layers.get(scale)
+        if layer is None:
+            size = (scaled(self.width, scale), scaled(self.height, scale))
+            layer = self.scaled_layers[scale] = pygame.transform.smoothscale(self.layer, size)
+        return layer
 
 class Button:
-    def __init__(self, x, y, width, height, text, color, font=None):
+    def __init__(self, x, y, width, height, text, color, font_size=28):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
         self.is_hovered = False
-        self.font = font or get_chinese_font(28)  # 使用传入的字体或默认中文字体
+        self.font_size = font_size  # 中文字体的字号，字体在首次绘制时加载
+
+    @property
+    def font(self):
+        return font_registry.chinese(self.font_size)
 
     def draw(self, screen):
         # 绘制按钮背景
@@ -701,10 +261,14 @@ class Button:
         pygame.draw.rect(screen, color, self.rect)
         
         # 绘制文字
-        text_surface = self.font.render(self.text, True, WHITE)
+        text_surface = text_cache.render(self.font, self.text, WHITE)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
 
+    def get_draw_signature(self):
+        """决定外观的状态，不变时无需重绘"""
+        return (self.text, self.is_hovered)
+
     def handle_event(self, event):
         if event.type == pygame.MOUSEMOTION:
             self.is_hovered = self.rect.collidepoint(event.pos)
@@ -713,276 +277,178 @@ class Button:
                 return True
         return False
 
-class Ball:
-    def __init__(self, x, y, color):
-        self.original_x = x
-        self.original_y = y
-        self.x = x
-        self.y = y
-        self.color = color
-        self.dx = 0
-        self.dy = 0
-        self.angle = 0
-        self.power = ARROW_LENGTH_MIN
-        self.base_power_max = ARROW_LENGTH_MAX
-        self.max_power = self.base_power_max
-        self.base_radius = BALL_RADIUS
-        self.radius = self.base_radius
-        self.is_aiming = False
-        self.is_power_adjusting = False
-        self.is_moving = False
-        self.power_increasing = True
-        self.turn_complete = False
-        self.base_rotation_speed = ROTATION_SPEED
-        self.rotation_speed = self.base_rotation_speed
-        
-        # 效果状态跟踪
-        self.effects = {
-            PowerUpType.SPEED_UP: {'active': False, 'end_time': 0},
-            PowerUpType.SPEED_DOWN: {'active': False, 'end_time': 0},
-            PowerUpType.POWER_UP: {'active': False, 'end_time': 0},
-            PowerUpType.POWER_DOWN: {'active': False, 'end_time': 0},
-            PowerUpType.SIZE_UP: {'active': False, 'end_time': 0},
-            PowerUpType.SIZE_DOWN: {'active': False, 'end_time': 0},
-            PowerUpType.RESET_POSITION: {'active': False, 'end_time': 0}
-        }
-
-    def shoot(self):
-        """发射球"""
-        # 根据角度和力量设置速度
-        self.dx = math.cos(math.radians(self.angle)) * (self.power / 10)
-        self.dy = math.sin(math.radians(self.angle)) * (self.power / 10)
-        self.is_moving = True
-        self.is_aiming = False
-        self.is_power_adjusting = False
-        self.power = ARROW_LENGTH_MIN  # 重置力量
-        print(f"球被发射: 速度({self.dx}, {self.dy}), 角度{self.angle}, 力量{self.power}")
-
-    def update(self):
-        """更新球的状态"""
-        # 更新效果状态
-        current_time = pygame.time.get_ticks()
-        for effect_type, effect_data in self.effects.items():
-            if effect_data['active']:
-                if current_time >= effect_data['end_time']:
-                    # 效果结束，重置相关属性
-                    effect_data['active'] = False
-                    if effect_type in [PowerUpType.SPEED_UP, PowerUpType.SPEED_DOWN]:
-                        self.rotation_speed = self.base_rotation_speed
-                        print(f"旋转速度效果结束，恢复为: {self.rotation_speed}")
-                    elif effect_type in [PowerUpType.POWER_UP, PowerUpType.POWER_DOWN]:
-                        self.max_power = self.base_power_max
-                        print(f"力量效果结束，恢复为: {self.max_power}")
-                    elif effect_type in [PowerUpType.SIZE_UP, PowerUpType.SIZE_DOWN]:
-                        self.radius = self.base_radius
-                        print(f"大小效果结束，恢复为: {self.radius}")
-        
-        # 更新移动状态
-        if self.is_moving:
-            self.x += self.dx
-            self.y += self.dy
-            self.dx *= FRICTION
-            self.dy *= FRICTION
-            
-            if abs(self.dx) < 0.1 and abs(self.dy) < 0.1:
-                self.dx = 0
-                self.dy = 0
-                self.is_moving = False
-                self.turn_complete = True
-            
-            # 边界碰撞检测
-            if self.x - self.radius <= 0 or self.x + self.radius >= WINDOW_WIDTH:
-                self.dx *= -1
-            if self.y - self.radius <= 0 or self.y + self.radius >= WINDOW_HEIGHT:
-                self.dy *= -1
-            
-            self.x = max(self.radius, min(self.x, WINDOW_WIDTH - self.radius))
-            self.y = max(self.radius, min(self.y, WINDOW_HEIGHT - self.radius))
-
-    def update_effects(self):
-        """更新效果状态"""
-        current_time = pygame.time.get_ticks()
-        
-        for effect_type, effect_data in self.effects.items():
-            if effect_data['active'] and current_time >= effect_data['end_time']:
-                # 效果结束，重置相关属性
-                effect_data['active'] = False
-                if effect_type in [PowerUpType.SPEED_UP, PowerUpType.SPEED_DOWN, PowerUpType.POWER_UP, PowerUpType.POWER_DOWN, PowerUpType.SIZE_UP, PowerUpType.SIZE_DOWN]:
-                    self.radius = self.base_radius
-                    print(f"球体半径恢复到 {self.radius}")
-
-    def reset_position(self):
-        """重置到初始位置"""
-        self.x = self.original_x
-        self.y = self.original_y
-        self.dx = 0
-        self.dy = 0
-        self.is_moving = False
-        self.is_aiming = False
-        self.is_power_adjusting = False
-        self.power = ARROW_LENGTH_MIN
-        self.angle = 0
-        print(f"球体重置到初始位置: ({self.x}, {self.y})")
-
-    def apply_effect(self, effect_type):
-        """应用道具效果"""
-        current_time = pygame.time.get_ticks()
-        duration = random.randint(30000, 60000)  # 30-60秒的效果持续时间
-        
-        # 处理随机效果
-        if effect_type == PowerUpType.RANDOM:
-            available_effects = [e for e in PowerUpType if e != PowerUpType.RANDOM]
-            effect_type = random.choice(available_effects)
-            print(f"随机效果转化为: {effect_type.value}")
-        
-        # 重置位置是即时效果
-        if effect_type == PowerUpType.RESET_POSITION:
-            self.reset_position()
-            self.turn_complete = True  # 标记回合结束
-            print("位置已重置，回合结束")
-            return
-        
-        # 设置效果持续时间
-        self.effects[effect_type]['active'] = True
-        self.effects[effect_type]['end_time'] = current_time + duration
-        
-        # 应用效果
-        if effect_type == PowerUpType.SPEED_UP:
-            self.rotation_speed = self.base_rotation_speed * 2.0
-        elif effect_type == PowerUpType.SPEED_DOWN:
-            self.rotation_speed = self.base_rotation_speed * 0.5
-        elif effect_type == PowerUpType.POWER_UP:
-            self.max_power = self.base_power_max * 1.5
-        elif effect_type == PowerUpType.POWER_DOWN:
-            self.max_power = self.base_power_max * 0.7
-        elif effect_type == PowerUpType.SIZE_UP:
-            self.radius = self.base_radius * 2.0
-        elif effect_type == PowerUpType.SIZE_DOWN:
-            self.radius = self.base_radius * 0.5
-        
-        print(f"应用效果: {effect_type.value}")
-        print(f"当前状态 - 旋转速度: {self.rotation_speed}, 最大力量: {self.max_power}, 半径: {self.radius}")
-        print(f"效果持续时间: {duration/1000}秒")
-
-    def draw(self, screen):
-        # 绘制球体
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(self.radius))
-        
-        # 如果在瞄准或调整力量，绘制方向箭头
-        if self.is_aiming or self.is_power_adjusting:
-            self.draw_direction_arrow(screen)
-        
-        # 绘制活跃效果
-        self.draw_active_effects(screen)
-
-    def draw_direction_arrow(self, screen):
-        """绘制美化后的方向箭头"""
-        # 计算箭头终点
-        end_x = self.x + math.cos(math.radians(self.angle)) * self.power
-        end_y = self.y + math.sin(math.radians(self.angle)) * self.power
-        
-        # 箭头参数
-        arrow_width = 3
-        head_length = 20
-        head_width = 15
-        
-        # 确定箭头颜色
-        if self.is_power_adjusting:
-            # 根据力量大小渐变颜色
-            power_ratio = (self.power - ARROW_LENGTH_MIN) / (ARROW_LENGTH_MAX - ARROW_LENGTH_MIN)
-            arrow_color = (
-                int(255 * power_ratio),  # R
-                int(255 * (1 - power_ratio)),  # G
-                0  # B
-            )
-        else:
-            # 瞄准时使用固定颜色
-            arrow_color = (100, 200, 255)
-        
-        # 计算箭头主体的方向向量
-        dx = end_x - self.x
-        dy = end_y - self.y
-        length = math.sqrt(dx * dx + dy * dy)
-        if length == 0:
-            return
-        
-        # 单位向量
-        unit_x = dx / length
-        unit_y = dy / length
-        
-        # 绘制箭头主体（渐变效果）
-        segments = 10
-        for i in range(segments):
-            start_ratio = i / segments
-            end_ratio = (i + 1) / segments
-            start_x = self.x + dx * start_ratio
-            start_y = self.y + dy * start_ratio
-            segment_end_x = self.x + dx * end_ratio
-            segment_end_y = self.y + dy * end_ratio
-            
-            # 渐变透明度
-            alpha = 255 - int(200 * (i / segments))
-            # 确保颜色值在有效范围内
-            r = min(255, max(0, arrow_color[0]))
-            g = min(255, max(0, arrow_color[1]))
-            b = min(255, max(0, arrow_color[2]))
-            segment_color = (r, g, b, alpha)
-            
-            # 创建surface来支持透明度
-            line_surface = pygame.Surface((int(length), arrow_width * 2), pygame.SRCALPHA)
-            pygame.draw.line(
-                line_surface,
-                segment_color,
-                (int(length * start_ratio), arrow_width),
-                (int(length * end_ratio), arrow_width),
-                arrow_width
-            )
-            
-            # 旋转surface
-            angle = math.degrees(math.atan2(dy, dx))
-            rotated_surface = pygame.transform.rotate(line_surface, -angle)
-            
-            # 计算绘制位置
-            draw_pos = (
-                int(start_x - rotated_surface.get_width()/2),
-                int(start_y - rotated_surface.get_height()/2)
-            )
-            screen.blit(rotated_surface, draw_pos)
-        
-        # 绘制箭头头部
-        head_surface = pygame.Surface((head_length * 2, head_width * 2), pygame.SRCALPHA)
-        # 确保箭头头部颜色有效
-        head_color = (
-            min(255, max(0, arrow_color[0])),
-            min(255, max(0, arrow_color[1])),
-            min(255, max(0, arrow_color[2])),
-            200
+def get_arrow_color(power, mode):
+    """箭头颜色：瞄准时固定颜色，调整力量时随力量由绿变红"""
+    if mode == 'power':
+        # 根据力量大小渐变颜色
+        power_ratio = (power - ARROW_LENGTH_MIN) / (ARROW_LENGTH_MAX - ARROW_LENGTH_MIN)
+        return (
+            int(255 * power_ratio),  # R
+            int(255 * (1 - power_ratio)),  # G
+            0  # B
         )
-        pygame.draw.polygon(
-            head_surface,
-            head_color,
-            [
-                (head_length * 2, head_width),
-                (head_length, head_width - head_width/2),
-                (head_length, head_width + head_width/2)
-            ]
+    # 瞄准时使用固定颜色
+    return (100, 200, 255)
+
+def build_arrow_sprite(angle, power, mode, gradient=True):
+    """把渐变箭头主体和头部预合成到一张透明 Surface 上
+
+    返回 (sprite, offset)，offset 是精灵左上角相对球心的偏移；gradient 为 False 时主体为单段实线
+    """
+    # 计算箭头终点（相对球心）
+    end_x = math.cos(math.radians(angle)) * power
+    end_y = math.sin(math.radians(angle)) * power
+    
+    # 箭头参数
+    arrow_width = 3
+    head_length = 20
+    head_width = 15
+    
+    arrow_color = get_arrow_color(power, mode)
+    # 确保颜色值在有效范围内
+    r = min(255, max(0, arrow_color[0]))
+    g = min(255, max(0, arrow_color[1]))
+    b = min(255, max(0, arrow_color[2]))
+    
+    # 计算箭头主体的方向向量
+    dx = end_x
+    dy = end_y
+    length = math.sqrt(dx * dx + dy * dy)
+    rotation = math.degrees(math.atan2(dy, dx))
+    
+    # 收集所有需要合成的部件及其位置
+    parts = []
+    
+    # 箭头主体（渐变效果）
+    segments = 10 if gradient else 1
+    for i in range(segments):
+        start_ratio = i / segments
+        end_ratio = (i + 1) / segments
+        start_x = dx * start_ratio
+        start_y = dy * start_ratio
+        
+        # 渐变透明度
+        alpha = 255 - int(200 * (i / segments))
+        segment_color = (r, g, b, alpha)
+        
+        # 创建surface来支持透明度
+        line_surface = pygame.Surface((int(length), arrow_width * 2), pygame.SRCALPHA)
+        pygame.draw.line(
+            line_surface,
+            segment_color,
+            (int(length * start_ratio), arrow_width),
+            (int(length * end_ratio), arrow_width),
+            arrow_width
         )
         
-        # 旋转箭头头部
-        rotated_head = pygame.transform.rotate(head_surface, -angle)
-        head_pos = (
-            int(end_x - rotated_head.get_width()/2),
-            int(end_y - rotated_head.get_height()/2)
+        # 旋转surface
+        rotated_surface = pygame.transform.rotate(line_surface, -rotation)
+        parts.append((rotated_surface, (
+            int(start_x - rotated_surface.get_width()/2),
+            int(start_y - rotated_surface.get_height()/2)
+        )))
+    
+    # 箭头头部
+    head_surface = pygame.Surface((head_length * 2, head_width * 2), pygame.SRCALPHA)
+    pygame.draw.polygon(
+        head_surface,
+        (r, g, b, 200),
+        [
+            (head_length * 2, head_width),
+            (head_length, head_width - head_width/2),
+            (head_length, head_width + head_width/2)
+        ]
+    )
+    rotated_head = pygame.transform.rotate(head_surface, -rotation)
+    parts.append((rotated_head, (
+        int(end_x - rotated_head.get_width()/2),
+        int(end_y - rotated_head.get_height()/2)
+    )))
+    
+    # 合成到刚好容纳所有部件的精灵上
+    bounds = pygame.Rect(parts[0][1], parts[0][0].get_size())
+    for surface, pos in parts[1:]:
+        bounds.union_ip(pygame.Rect(pos, surface.get_size()))
+    sprite = pygame.Surface(bounds.size, pygame.SRCALPHA)
+    for surface, pos in parts:
+        sprite.blit(surface, (pos[0] - bounds.x, pos[1] - bounds.y))
+    return sprite, (bounds.x, bounds.y)
+
+def scale_sprite(sprite, offset, scale):
+    """把按世界坐标合成的精灵缩放到内部分辨率，返回 (sprite, offset)"""
+    size = (scaled(sprite.get_width(), scale), scaled(sprite.get_height(), scale))
+    return (pygame.transform.smoothscale(sprite, size),
+            (int(round(offset[0] * scale)), int(round(offset[1] * scale))))
+
+class Ball(simulation.Ball):
+    __slots__ = ()
+
+    def draw(self, screen, scale=1.0):
+        """绘制球、方向箭头和效果图标；scale 为内部分辨率相对世界坐标的比例"""
+        with profiler.phase('draw.balls'):
+            # 绘制球体
+            pygame.draw.circle(screen, self.color, (int(self.x * scale), int(self.y * scale)),
+                               int(self.radius * scale))
+            
+            # 如果在瞄准或调整力量，绘制方向箭头
+            if self.is_aiming or self.is_power_adjusting:
+                with profiler.phase('draw.arrows'):
+                    self.draw_direction_arrow(screen, scale)
+            
+            # 绘制活跃效果
+            self.draw_active_effects(screen, scale)
+
+    def get_dirty_rect(self):
+        """覆盖球体、方向箭头、力量指示器和效果图标的矩形"""
+        extent = self.radius + 2
+        if self.is_aiming or self.is_power_adjusting:
+            # 箭头的渐变线段最远延伸到 1.5 倍长度，箭头头部约 25 像素
+            extent = max(extent, self.power * 1.5 + 25)
+        rect = pygame.Rect(self.x - extent, self.y - extent, extent * 2, extent * 2)
+        
+        active_count = len(self.active_effects())
+        if active_count:
+            # 效果图标一行，剩余时间文字在图标上方
+            half_width = active_count * 25 / 2 + 25
+            rect.union_ip(pygame.Rect(self.x - half_width, self.y - self.radius - 60,
+                                      half_width * 2, 60))
+        return rect
+
+    def get_draw_signature(self):
+        """决定外观的状态，不变时无需重绘"""
+        current_time = self.clock.get_ticks()
+        effects = tuple(
+            (effect_type, min(int((end_time - current_time) / 1000), 6))
+            for effect_type, end_time in self.active_effects()
         )
-        screen.blit(rotated_head, head_pos)
+        return (self.x, self.y, self.radius, self.color, self.is_aiming, self.is_power_adjusting,
+                self.angle, self.power, effects)
+
+    def draw_direction_arrow(self, screen, scale=1.0):
+        """绘制美化后的方向箭头（使用缓存的箭头精灵，每帧一次 blit）"""
+        # 量化角度和力量作为缓存键
+        angle = round(self.angle / ARROW_ANGLE_STEP) * ARROW_ANGLE_STEP % 360
+        power = int(round(self.power))
+        mode = 'power' if self.is_power_adjusting else 'aim'
+        gradient = quality.enabled('arrow_gradient')
+        if power <= 0:
+            return
+        sprite, offset = arrow_cache.get(
+            (angle, power, mode, gradient), lambda: build_arrow_sprite(angle, power, mode, gradient))
+        if scale != 1.0:
+            # 内部分辨率下使用缩放后的精灵，同样按 scale 缓存
+            sprite, offset = arrow_cache.get(
+                (angle, power, mode, gradient, scale), lambda: scale_sprite(sprite, offset, scale))
+        screen.blit(sprite, (int(self.x * scale) + offset[0], int(self.y * scale) + offset[1]))
         
         # 如果在调整力量，添加力量指示器
         if self.is_power_adjusting:
+            arrow_color = get_arrow_color(self.power, mode)
             power_ratio = (self.power - ARROW_LENGTH_MIN) / (ARROW_LENGTH_MAX - ARROW_LENGTH_MIN)
-            bar_width = 50
-            bar_height = 6
-            bar_x = self.x - bar_width/2
-            bar_y = self.y - self.radius - 20
+            bar_width = 50 * scale
+            bar_height = scaled(6, scale)
+            bar_x = (self.x - 25) * scale
+            bar_y = (self.y - self.radius - 20) * scale
             
             # 确保使用RGB颜色值（不包含alpha通道）
             bar_color = (
@@ -1002,25 +468,25 @@ class Ball:
             pygame.draw.rect(screen, (200, 200, 200),
                             (int(bar_x), int(bar_y), int(bar_width), int(bar_height)), 1)
 
-    def draw_active_effects(self, screen):
+    def draw_active_effects(self, screen, scale=1.0):
         """绘制当前活跃的效果图标"""
-        current_time = pygame.time.get_ticks()
-        active_effects = [(effect, data) for effect, data in self.effects.items() 
-                         if data['active']]
+        current_time = self.clock.get_ticks()
+        active_effects = self.active_effects()
         
         if not active_effects:
             return
             
-        icon_size = 20
+        icon_size = scaled(20, scale)
         spacing = 25
         start_x = self.x - (len(active_effects) * spacing) / 2
+        font = font_registry.default(scaled(20, scale))
         
-        for i, (effect_type, effect_data) in enumerate(active_effects):
-            remaining_time = (effect_data['end_time'] - current_time) / 1000
+        for i, (effect_type, end_time) in enumerate(active_effects):
+            remaining_time = (end_time - current_time) / 1000
             
             # 绘制效果图标
-            icon_x = start_x + i * spacing
-            icon_y = self.y - self.radius - 25
+            icon_x = (start_x + i * spacing) * scale
+            icon_y = (self.y - self.radius - 25) * scale
             
             # 绘制图标背景
             bg_color = (255, 100, 100) if effect_type in [PowerUpType.SPEED_UP, 
@@ -1029,16 +495,15 @@ class Ball:
             pygame.draw.circle(screen, bg_color, (int(icon_x), int(icon_y)), icon_size//2)
             
             # 绘制效果文字
-            font = pygame.font.Font(None, 20)
             text = self.get_effect_symbol(effect_type)
-            text_surface = font.render(text, True, (255, 255, 255))
+            text_surface = text_cache.render(font, text, (255, 255, 255))
             text_rect = text_surface.get_rect(center=(icon_x, icon_y))
             screen.blit(text_surface, text_rect)
             
             # 显示剩余时间
             if remaining_time <= 5:
-                time_text = font.render(f"{int(remaining_time)}", True, (255, 255, 255))
-                time_rect = time_text.get_rect(center=(icon_x, icon_y - 20))
+                time_text = text_cache.render(font, f"{int(remaining_time)}", (255, 255, 255))
+                time_rect = time_text.get_rect(center=(icon_x, icon_y - 20 * scale))
                 screen.blit(time_text, time_rect)
 
     def get_effect_symbol(self, effect_type):
@@ -1054,53 +519,410 @@ class Ball:
         }
         return symbols.get(effect_type, "?")
 
-def main():
-    clock = pygame.time.Clock()
-    game = Game()
-    running = True
+class Game(simulation.Game):
+    # 使用带绘制方法的实体
+    ball_class = Ball
+    power_up_class = PowerUp
+    obstacle_class = Obstacle
 
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if game.quit_button.handle_event(event):
-                    running = False
-            elif event.type == pygame.MOUSEMOTION:
-                game.quit_button.handle_event(event)
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    if game.game_over:
-                        game.reset_game()
-                    elif game.current_turn == "player" and not game.player_ball.is_moving:
-                        if not game.player_ball.is_aiming and not game.player_ball.is_power_adjusting:
-                            game.player_ball.is_aiming = True
-                        elif game.player_ball.is_aiming:
-                            game.player_ball.is_aiming = False
-                            game.player_ball.is_power_adjusting = True
-                        elif game.player_ball.is_power_adjusting:
-                            game.player_ball.shoot()
+    def __init__(self, clock=None, full_flip_ratio=0.5, swept_collisions=True, rng=None, events=None, planner=None):
+        # 创建按钮时使用中文字体（字体在首次绘制时加载）
+        self.quit_button = Button(WINDOW_WIDTH - 120, 20, 100, 40, "退出", RED, 24)
+        
+        # 创建背景
+        self.background = Background(WINDOW_WIDTH, WINDOW_HEIGHT)
+        
+        # 脏矩形渲染：变化面积超过 full_flip_ratio 时整屏刷新
+        self.dirty_tracker = DirtyRectTracker((WINDOW_WIDTH, WINDOW_HEIGHT), full_flip_ratio)
+        
+        # 是否显示计时图表
+        self.show_profiler = False
+        
+        # 初始化模拟核心（会重置游戏状态）
+        super().__init__(clock, swept_collisions, planner=planner, profiler=profiler, rng=rng, events=events)
+
+    @property
+    def font(self):
+        return font_registry.chinese(36)
+
+    def generate_obstacles(self):
+        """生成障碍物，并重建静态背景层"""
+        super().generate_obstacles()
+        self.background.build(self.obstacles)
+
+    def draw(self, screen, target=None):
+        """整屏绘制一帧；target 为内部分辨率低于窗口的 RenderTarget 时先绘制场景再放大"""
+        if target is not None and not target.native:
+            self.draw_scaled(screen, target)
+            return
+        
+        # 绘制背景与障碍物（预渲染的静态层）
+        with profiler.phase('draw.background'):
+            self.background.draw(screen)
+        
+        # 按顺序绘制道具、信息面板、球和按钮
+        for _, _, _, draw in self.get_drawables():
+            draw(screen)
+        
+        # 游戏结束显示
+        if self.game_over:
+            self.draw_game_over(screen)
+
+    def draw_scaled(self, screen, target):
+        """场景（背景、道具、球）按内部分辨率绘制后放大到窗口，界面（信息面板、按钮、图表）按窗口分辨率绘制"""
+        surface = target.surface
+        scale = target.scale
+        with profiler.phase('draw.background'):
+            self.background.draw(surface, scale)
+        for power_up in self.power_ups:
+            if not power_up.collected:
+                self.draw_power_up(surface, power_up, scale)
+        for ball in (self.player_ball, self.computer_ball):
+            ball.draw(surface, scale)
+        with profiler.phase('draw.scale'):
+            target.present(screen)
+        
+        # 界面在放大后绘制，文字保持清晰（信息面板因此位于球之上）
+        self.draw_hud(screen)
+        self.quit_button.draw(screen)
+        if self.show_profiler:
+            self.draw_profiler_overlay(screen)
+        if self.game_over:
+            self.draw_game_over(screen)
+
+    def draw_dirty(self, screen):
+        """脏矩形模式绘制一帧，返回需要提交的矩形列表；None 表示整屏刷新"""
+        if self.game_over:
+            # 遮罩覆盖整个屏幕，结束后需要整屏重绘
+            self.draw(screen)
+            self.dirty_tracker.invalidate()
+            return None
+        return self.dirty_tracker.render(screen, self.background.layer, self.get_drawables())
 
-        # 更新玩家的箭头旋转和力量
-        if game.player_ball.is_aiming:
-            game.player_ball.angle = (game.player_ball.angle + ROTATION_SPEED) % 360
+    def get_drawables(self):
+        """动态元素列表，按绘制顺序，每项为 (key, rect, signature, draw)"""
+        drawables = []
         
-        if game.player_ball.is_power_adjusting:
-            if game.player_ball.power_increasing:
-                game.player_ball.power += POWER_CHANGE_SPEED
-                if game.player_ball.power >= ARROW_LENGTH_MAX:
-                    game.player_ball.power_increasing = False
+        # 道具
+        for power_up in self.power_ups:
+            if not power_up.collected:
+                drawables.append((
+                    id(power_up),
+                    self.get_power_up_rect(power_up),
+                    power_up.get_draw_signature(),
+                    lambda screen, power_up=power_up: self.draw_power_up(screen, power_up)
+                ))
+        
+        # 信息面板
+        turn_text, power_width = self.get_hud_state()
+        hud_rect = pygame.Rect(20, 20, 300, 150)
+        hud_rect.union_ip(pygame.Rect((20, 20), self.font.size(turn_text)))
+        drawables.append(('hud', hud_rect, (turn_text, power_width), self.draw_hud))
+        
+        # 球
+        for ball in (self.player_ball, self.computer_ball):
+            drawables.append((id(ball), ball.get_dirty_rect(), ball.get_draw_signature(), ball.draw))
+        
+        # 退出按钮
+        drawables.append(('quit_button', pygame.Rect(self.quit_button.rect),
+                          self.quit_button.get_draw_signature(), self.quit_button.draw))
+        
+        # 计时图表（每帧都变化）
+        if self.show_profiler:
+            drawables.append(('profiler', PROFILER_PANEL, profiler.frames, self.draw_profiler_overlay))
+        return drawables
+
+    def get_power_up_rect(self, power_up):
+        """覆盖道具本体（含脉动）和上方倒计时文字的矩形"""
+        text_width, text_height = self.font.size("00")
+        half_width = max(power_up.radius + 3, text_width)
+        top = power_up.y - power_up.radius - 20 - text_height
+        bottom = power_up.y + power_up.radius + 3
+        return pygame.Rect(power_up.x - half_width, top, half_width * 2, bottom - top)
+
+    def draw_power_up(self, screen, power_up, scale=1.0):
+        with profiler.phase('draw.power_ups'):
+            power_up.draw(screen, scale)
+            
+            # 计算并显示剩余时间
+            remaining_time = (power_up.lifetime - 
+                            (self.clock.get_ticks() - power_up.creation_time)) // 1000
+            
+            # 最后5秒显示计时
+            if remaining_time <= 5:
+                font = self.font if scale == 1.0 else font_registry.chinese(scaled(36, scale))
+                time_text = text_cache.render(font, str(remaining_time), power_up.color)
+                time_rect = time_text.get_rect(
+                    center=(power_up.x * scale, (power_up.y - power_up.radius - 20) * scale)
+                )
+                screen.blit(time_text, time_rect)
+
+    def get_hud_state(self):
+        """信息面板显示的回合文字和力量条宽度（不显示力量条时为 None）"""
+        turn_text = f"当前回合: {'玩家' if self.current_turn == 'player' else '电脑'}"
+        power_width = None
+        if self.current_turn == "player" and self.player_ball.is_power_adjusting:
+            power_percentage = (self.player_ball.power - ARROW_LENGTH_MIN) / (ARROW_LENGTH_MAX - ARROW_LENGTH_MIN)
+            power_width = 200 * power_percentage
+        return turn_text, power_width
+
+    def draw_hud(self, screen):
+        with profiler.phase('draw.hud'):
+            turn_text, power_width = self.get_hud_state()
+            
+            # 绘制信息面板（画质降低时为不透明面板）
+            if quality.enabled('translucent'):
+                panel_surface = pygame.Surface((300, 150), pygame.SRCALPHA)
+                pygame.draw.rect(panel_surface, COLORS['panel'], panel_surface.get_rect())
+                screen.blit(panel_surface, (20, 20))
             else:
-                game.player_ball.power -= POWER_CHANGE_SPEED
-                if game.player_ball.power <= ARROW_LENGTH_MIN:
-                    game.player_ball.power_increasing = True
+                pygame.draw.rect(screen, COLORS['panel'][:3], (20, 20, 300, 150))
+            
+            # 显示当前回合
+            text_surface = text_cache.render(self.font, turn_text, BLACK)
+            screen.blit(text_surface, (20, 20))
+            
+            # 绘制力量条
+            if power_width is not None:
+                pygame.draw.rect(screen, COLORS['power_bar'], (40, 80, power_width, 20))
+                pygame.draw.rect(screen, COLORS['title'], (40, 80, 200, 20), 2)
+
+    def draw_profiler_overlay(self, screen):
+        """计时图表：左侧为最近各帧主循环阶段的堆叠柱，右侧为各阶段的 p50/p95/p99（毫秒）"""
+        panel = PROFILER_PANEL
+        if quality.enabled('translucent'):
+            panel_surface = pygame.Surface(panel.size, pygame.SRCALPHA)
+            panel_surface.fill((0, 0, 0, 170))
+            screen.blit(panel_surface, panel.topleft)
+        else:
+            screen.fill((0, 0, 0), panel)
+        
+        # 堆叠柱状图，每帧 1 像素宽，虚线为 60 FPS 的帧预算
+        graph = pygame.Rect(panel.x + 10, panel.y + 10, 240, panel.height - 20)
+        scale = graph.height / PROFILER_GRAPH_MS
+        series = [(profiler.samples(name)[-graph.width:], color) for name, color in PROFILER_PHASES]
+        for column in range(max(len(samples) for samples, _ in series)):
+            bottom = graph.bottom
+            for samples, color in series:
+                if column < len(samples):
+                    height = min(samples[column] * 1000 * scale, bottom - graph.top)
+                    if height >= 1:
+                        pygame.draw.line(screen, color, (graph.x + column, bottom),
+                                         (graph.x + column, bottom - height))
+                        bottom -= height
+        budget_y = graph.bottom - 1000 / self.clock.tick_rate * scale
+        for x in range(graph.x, graph.right, 6):
+            pygame.draw.line(screen, WHITE, (x, budget_y), (x + 3, budget_y))
+        
+        # 统计表（每帧变化，不进入文字缓存）
+        font = font_registry.default(20)
+        x = graph.right + 10
+        y = panel.y + 10
+        columns = (x + 150, x + 200, x + 250)  # 各列数值的右边界
+        colors = dict(PROFILER_PHASES)
+        rows = [("phase", ("p50", "p95", "p99"), WHITE)]
+        for name, stats in profiler.summary().items():
+            values = tuple(f"{stats[key]:.2f}" for key in ('p50', 'p95', 'p99'))
+            rows.append((name, values, colors.get(name, WHITE)))
+        for name, values, color in rows:
+            if y > panel.bottom - 16:
+                break
+            screen.blit(font.render(name, True, color), (x, y))
+            for right, value in zip(columns, values):
+                text = font.render(value, True, color)
+                screen.blit(text, (right - text.get_width(), y))
+            y += 16
+
+    def draw_game_over(self, screen):
+        # 创建半透明遮罩；画质降低时只在文字后面画一条不透明的横条，不做整屏混合
+        if quality.enabled('translucent'):
+            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+            pygame.draw.rect(overlay, (0, 0, 0, 128), overlay.get_rect())
+            screen.blit(overlay, (0, 0))
+        else:
+            screen.fill(BLACK, (0, WINDOW_HEIGHT / 2 - 60, WINDOW_WIDTH, 120))
+        
+        # 显示获胜信息
+        win_text = f"{self.winner}获胜！按空格键重新开始"
+        text_surface = text_cache.render(self.font, win_text, WHITE)
+        text_rect = text_surface.get_rect(center=(WINDOW_WIDTH/2, WINDOW_HEIGHT/2))
+        screen.blit(text_surface, text_rect)
 
-        game.update()
-        game.draw(screen)
-        pygame.display.flip()
-        clock.tick(60)
+def main(dirty_rects=True, full_flip_ratio=0.5, profile=False, record=None, replay_path=None, replay_speed=1.0,
+         threaded=True, fps=None, vsync=False, render_scale=1.0, adaptive=False, target_fps=60,
+         quality_level=None, log_level=None, log_path=None, difficulty=None):
+    """运行游戏
+
+    dirty_rects 为 True 时只提交变化的区域，profile 为 True 时从启动起记录分阶段计时；
+    record 为录像保存路径（退出时写入）；replay_path 为要回放的录像，replay_speed 为回放倍速；
+    threaded 为 True 时模拟在后台线程中按固定步长推进，否则在主循环中按墙钟时间补推进；
+    fps 为渲染帧率上限（0 不限），默认开启了垂直同步时不限、否则为 FALLBACK_FPS；
+    vsync 为 True 时尝试开启垂直同步（窗口改为 SCALED 模式，见 init）；
+    render_scale 为内部渲染分辨率相对窗口的比例，adaptive 为 True 时按绘制耗时在
+    ADAPTIVE_MIN_SCALE 与 render_scale 之间调整内部分辨率，以维持 target_fps；
+    quality_level 为固定的画质等级（QUALITY_NAMES 之一），默认按绘制耗时自动调整，
+    超出预算时先降低画质，画质已降到最低时才降低分辨率，恢复时顺序相反；
+    log_level 为打印到控制台的最低事件级别（默认不打印），log_path 为异步写入游戏事件的 JSON Lines 文件；
+    difficulty 为 planner.DIFFICULTY 中的难度时电脑用 ShotPlanner 搜索击球，默认使用直线瞄准
+    """
+    event_bus = EventBus()
+    if log_level is not None:
+        event_bus.add_sink(ConsoleSink(), LEVELS[log_level])
+    event_file = None
+    if log_path is not None:
+        event_file = event_bus.add_sink(AsyncFileSink(log_path), DEBUG)
+    start = time.perf_counter()
+    screen = init(vsync)
+    if fps is None:
+        fps = 0 if vsync_enabled else FALLBACK_FPS
+    frame_clock = pygame.time.Clock()
+    quality.budget = 1 / target_fps
+    if quality_level is not None:
+        quality.set_level(quality_level)
+    render_target = RenderTarget((WINDOW_WIDTH, WINDOW_HEIGHT), render_scale)
+    resolution = None
+    if adaptive:
+        resolution = AdaptiveResolution(render_target, target_fps,
+                                        min_scale=min(ADAPTIVE_MIN_SCALE, render_target.scale),
+                                        max_scale=render_target.scale)
+    recorder = None
+    replayer = None
+    with startup_stage('game'):
+        if replay_path is not None:
+            recording = replay.Recording.load(replay_path)
+            game = replay.new_game(recording, Game, full_flip_ratio=full_flip_ratio, events=event_bus)
+            replayer = replay.Replayer(recording, game)
+        elif record is not None:
+            recorder = replay.Recorder()
+            game = recorder.create_game(Game, full_flip_ratio=full_flip_ratio, events=event_bus)
+        else:
+            planner = None
+            if difficulty is not None:
+                from planner import ShotPlanner
+                planner = ShotPlanner(difficulty)
+            game = Game(full_flip_ratio=full_flip_ratio, events=event_bus, planner=planner)
+    
+    def step():
+        with profiler.phase('update'):
+            if replayer is None:
+                game.update()
+            else:
+                replayer.step()
+    loop = SimulationLoop(game, step, finished=(lambda: replayer.finished) if replayer is not None else None,
+                          speed=replay_speed if replayer is not None else 1.0)
+    profiler.enabled = profile
+    running = True
+    first_frame = True
+    if threaded:
+        loop.start()
 
+    while running:
+        with profiler.phase('events'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if game.quit_button.handle_event(event):
+                        running = False
+                elif event.type == pygame.MOUSEMOTION:
+                    game.quit_button.handle_event(event)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        # 输入在两步之间施加；回放时忽略输入
+                        with loop.lock:
+                            if recorder is not None:
+                                recorder.press_space()
+                            elif replayer is None:
+                                game.press_space()
+                    elif event.key == pygame.K_F3:
+                        # 显示图表时开启计时
+                        game.show_profiler = not game.show_profiler
+                        profiler.enabled = profile or game.show_profiler
+                    elif event.key == pygame.K_F4:
+                        with loop.lock:
+                            path = profiler.dump(time.strftime("profile-%Y%m%d-%H%M%S.json"))
+                        print(f"计时数据已导出: {path}")
+
+        if not threaded:
+            with loop.lock:
+                loop.advance()
+        if loop.finished:
+            running = False
+        # 绘制时球位于最近两步之间的插值位置；绘制耗时从获取锁之后算起，不含等待模拟一步的时间
+        with loop.interpolated():
+            draw_start = time.perf_counter()
+            if dirty_rects and render_target.native:
+                with profiler.phase('draw'):
+                    rects = game.draw_dirty(screen)
+            else:
+                # 内部分辨率低于窗口时每帧整屏绘制并放大
+                with profiler.phase('draw'):
+                    game.draw(screen, render_target)
+                rects = None
+            draw_time = time.perf_counter() - draw_start
+        full_resolution = resolution is None or render_target.scale >= resolution.max_scale
+        if full_resolution and quality.update(draw_time):
+            # 外观改变（脏矩形的签名不含画质），整屏重绘
+            game.dirty_tracker.invalidate()
+            if event_bus.min_level <= INFO:
+                event_bus.emit(INFO, 'quality_changed', game.clock.get_ticks(), quality=quality.name,
+                               draw_ms=round(quality.average * 1000, 2))
+        if resolution is not None and (quality.level == 0 or not quality.governing or not full_resolution):
+            if resolution.update(draw_time):
+                # 切换分辨率后窗口内容来自另一条绘制路径，脏矩形需要整屏重绘
+                game.dirty_tracker.invalidate()
+        with profiler.phase('present'):
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+        # 模拟线程在持有锁时记录 update 各阶段，结束一帧（清空当前帧的累计耗时）也要持有锁
+        with loop.lock:
+            profiler.end_frame()
+        if first_frame:
+            # 第一帧已显示：打印启动各阶段的耗时
+            first_frame = False
+            startup_times['fonts'] = font_registry.load_time
+            startup_times['total'] = time.perf_counter() - start
+            print(f"启动耗时: {startup_report()}")
+        # 渲染帧率与模拟步长无关
+        frame_clock.tick(fps)
+
+    loop.stop()
+    if game.planner is not None:
+        game.planner.close()
+    if recorder is not None:
+        recorder.finish().save(record)
+        print(f"录像已保存: {record}")
+    if event_file is not None:
+        event_file.close()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="球类对战游戏")
+    parser.add_argument('--record', metavar='PATH', help="录制本局，退出时保存到 PATH")
+    parser.add_argument('--replay', metavar='PATH', help="回放录像")
+    parser.add_argument('--speed', type=float, default=1.0, help="回放倍速")
+    parser.add_argument('--profile', action='store_true', help="从启动起记录分阶段计时")
+    parser.add_argument('--full-flip', action='store_true', help="每帧整屏刷新，不使用脏矩形")
+    parser.add_argument('--fps', type=int, help="渲染帧率上限，0 为不限")
+    parser.add_argument('--vsync', action='store_true', help="开启垂直同步（窗口改为 SCALED 模式）")
+    parser.add_argument('--single-thread', action='store_true', help="模拟与绘制在同一线程中交替进行")
+    parser.add_argument('--render-scale', type=float, default=1.0, help="内部渲染分辨率相对窗口的比例")
+    parser.add_argument('--adaptive', action='store_true', help="按绘制耗时动态调整内部分辨率")
+    parser.add_argument('--target-fps', type=int, default=60, help="画质和动态分辨率要维持的帧率")
+    parser.add_argument('--quality', choices=QUALITY_NAMES, help="固定画质等级，默认按绘制耗时自动调整")
+    parser.add_argument('--log-level', choices=list(LEVELS), help="把不低于该级别的游戏事件打印到控制台")
+    parser.add_argument('--log', metavar='PATH', help="把游戏事件按 JSON Lines 异步写入 PATH")
+    parser.add_argument('--difficulty', choices=['easy', 'normal', 'hard'],
+                        help="电脑用蒙特卡洛击球搜索（planner.py）并使用该难度，默认直线瞄准")
+    args = parser.parse_args()
+    if args.difficulty is not None and (args.record is not None or args.replay is not None):
+        # 搜索受时间预算限制，结果与机器速度有关，无法按录像逐位复现
+        parser.error("--difficulty 不能与 --record、--replay 同时使用")
+    main(dirty_rects=not args.full_flip, profile=args.profile, record=args.record,
+         replay_path=args.replay, replay_speed=args.speed,
+         threaded=not args.single_thread, fps=args.fps, vsync=args.vsync,
+         render_scale=args.render_scale, adaptive=args.adaptive, target_fps=args.target_fps,
+         quality_level=args.quality, log_level=args.log_level, log_path=args.log,
+         difficulty=args.difficulty)
@@ -0,0 +1,189 @@
+# NumPy 批量物理引擎：以结构数组（struct-of-arrays）的形式，
+# 一次向量化调用同时推进 M 局独立对局中的 N 个球
+# 每一步的运算顺序与离散碰撞模式（simulation.Game(swept_collisions=False)）下的
+# Ball.update / Game.check_obstacle_collisions / Game.check_power_up_collisions 完全一致，结果逐位相同
+#
+# 数组的最后一维都是对局编号：球 (N, M)、障碍物 (K, M)、道具 (P, M)，
+# 这样广播时最内层循环是连续内存，成对检测的开销最小
+import numpy as np
+
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, FRICTION
+
+STOP_SPEED = 0.1  # 两个速度分量都低于该值时球停止
+
+class BatchPhysics:
+    def __init__(self, games, balls_per_game):
+        shape = (balls_per_game, games)
+        self.games = games
+        self.balls_per_game = balls_per_game
+
+        # 球的状态，形状均为 (N, M)
+        self.x = np.zeros(shape)
+        self.y = np.zeros(shape)
+        self.dx = np.zeros(shape)
+        self.dy = np.zeros(shape)
+        self.radius = np.zeros(shape)
+        self.moving = np.zeros(shape, dtype=bool)
+        self.turn_complete = np.zeros(shape, dtype=bool)
+
+        # 障碍物 AABB，形状 (K, M)；无效的填充项不会发生碰撞
+        self.load_obstacles([[] for _ in range(games)])
+        # 道具，形状 (P, M)
+        self.load_power_ups([[] for _ in range(games)])
+
+    @classmethod
+    def from_games(cls, games):
+        """从若干 simulation.Game 构建批量状态（每局两个球：玩家、电脑）"""
+        batch = cls(len(games), 2)
+        batch.load_balls([[game.player_ball, game.computer_ball] for game in games])
+        batch.load_obstacles([game.obstacles for game in games])
+        batch.load_power_ups([game.power_ups for game in games])
+        return batch
+
+    def load_balls(self, ball_lists):
+        """从 Ball 对象读取球的状态，ball_lists[m][n] 对应第 m 局第 n 个球"""
+        for m, balls in enumerate(ball_lists):
+            for n, ball in enumerate(balls):
+                self.x[n, m] = ball.x
+                self.y[n, m] = ball.y
+                self.dx[n, m] = ball.dx
+                self.dy[n, m] = ball.dy
+                self.radius[n, m] = ball.radius
+                self.moving[n, m] = ball.is_moving
+                self.turn_complete[n, m] = ball.turn_complete
+
+    def store_balls(self, ball_lists):
+        """把批量状态写回 Ball 对象"""
+        for m, balls in enumerate(ball_lists):
+            for n, ball in enumerate(balls):
+                ball.x = float(self.x[n, m])
+                ball.y = float(self.y[n, m])
+                ball.dx = float(self.dx[n, m])
+                ball.dy = float(self.dy[n, m])
+                ball.is_moving = bool(self.moving[n, m])
+                ball.turn_complete = bool(self.turn_complete[n, m])
+
+    def load_obstacles(self, obstacle_lists):
+        """读取每局的障碍物，数量不足的局用无效项填充"""
+        count = max((len(obstacles) for obstacles in obstacle_lists), default=0)
+        shape = (count, self.games)
+        self.obstacle_left = np.zeros(shape)
+        self.obstacle_top = np.zeros(shape)
+        self.obstacle_right = np.zeros(shape)
+        self.obstacle_bottom = np.zeros(shape)
+        self.obstacle_valid = np.zeros(shape, dtype=bool)
+        for m, obstacles in enumerate(obstacle_lists):
+            for k, obstacle in enumerate(obstacles):
+                rect = obstacle.rect
+                self.obstacle_left[k, m] = rect.left
+                self.obstacle_top[k, m] = rect.top
+                self.obstacle_right[k, m] = rect.right
+                self.obstacle_bottom[k, m] = rect.bottom
+                self.obstacle_valid[k, m] = rect.width > 0 and rect.height > 0
+
+    def load_power_ups(self, power_up_lists):
+        """读取每局的道具，已收集的道具不参与拾取检测"""
+        count = max((len(power_ups) for power_ups in power_up_lists), default=0)
+        shape = (count, self.games)
+        self.power_up_x = np.zeros(shape)
+        self.power_up_y = np.zeros(shape)
+        self.power_up_radius = np.zeros(shape)
+        self.power_up_active = np.zeros(shape, dtype=bool)
+        for m, power_ups in enumerate(power_up_lists):
+            for p, power_up in enumerate(power_ups):
+                self.power_up_x[p, m] = power_up.x
+                self.power_up_y[p, m] = power_up.y
+                self.power_up_radius[p, m] = power_up.radius
+                self.power_up_active[p, m] = not power_up.collected
+
+    def step_motion(self):
+        """移动、摩擦、停止判定、边界反弹与夹紧，对应 Ball.update 的移动部分"""
+        # 用 0/1 因子代替带 where= 的掩码运算（后者慢一个数量级），
+        # 乘 1.0、加 ±0.0 不改变任何值，结果与逐个处理完全一致
+        moving = self.moving
+        self.x += self.dx * moving
+        self.y += self.dy * moving
+        friction = np.where(moving, FRICTION, 1.0)
+        self.dx *= friction
+        self.dy *= friction
+
+        # 速度过低时停止
+        stopped = moving & (np.abs(self.dx) < STOP_SPEED) & (np.abs(self.dy) < STOP_SPEED)
+        self.dx[stopped] = 0.0
+        self.dy[stopped] = 0.0
+        self.moving = moving & ~stopped
+        self.turn_complete |= stopped
+
+        # 边界碰撞检测（本步开始时在移动的球，包括刚停下的球）
+        r = self.radius
+        hit_x = moving & ((self.x - r <= 0) | (self.x + r >= WINDOW_WIDTH))
+        hit_y = moving & ((self.y - r <= 0) | (self.y + r >= WINDOW_HEIGHT))
+        self.dx = np.where(hit_x, -self.dx, self.dx)
+        self.dy = np.where(hit_y, -self.dy, self.dy)
+
+        self.x = np.where(moving, np.maximum(r, np.minimum(self.x, WINDOW_WIDTH - r)), self.x)
+        self.y = np.where(moving, np.maximum(r, np.minimum(self.y, WINDOW_HEIGHT - r)), self.y)
+
+    def bounce_obstacles(self):
+        """移动中的球与障碍物 AABB 碰撞后反弹，对应 Game.check_obstacle_collisions"""
+        if self.obstacle_valid.shape[0] == 0:
+            return
+
+        # 球的包围盒按 pygame.Rect 的规则向零取整
+        r = self.radius
+        left = np.trunc(self.x - r)
+        top = np.trunc(self.y - r)
+        size = np.trunc(r * 2)
+        right = left + size
+        bottom = top + size
+
+        # 对所有（球，障碍物）对做 AABB 重叠检测 (N, K, M)，再只处理命中的少数几对
+        hit = left[:, None, :] < self.obstacle_right[None, :, :]
+        hit &= self.obstacle_left[None, :, :] < right[:, None, :]
+        hit &= top[:, None, :] < self.obstacle_bottom[None, :, :]
+        hit &= self.obstacle_top[None, :, :] < bottom[:, None, :]
+        n, k, m = np.unravel_index(np.flatnonzero(hit), hit.shape)
+        valid = self.moving[n, m] & self.obstacle_valid[k, m] & (size[n, m] > 0)
+        n, k, m = n[valid], k[valid], m[valid]
+
+        # 与多个障碍物碰撞时逐个翻转，等价于按碰撞次数的奇偶性翻转
+        bx = self.x[n, m]
+        by = self.y[n, m]
+        flip_x = (bx < self.obstacle_left[k, m]) | (bx > self.obstacle_right[k, m])
+        flip_y = (by < self.obstacle_top[k, m]) | (by > self.obstacle_bottom[k, m])
+        ball_index = n * self.games + m
+        flips_x = np.bincount(ball_index[flip_x], minlength=self.x.size).reshape(self.x.shape)
+        flips_y = np.bincount(ball_index[flip_y], minlength=self.x.size).reshape(self.x.shape)
+        self.dx = np.where(flips_x % 2 == 1, -self.dx, self.dx)
+        self.dy = np.where(flips_y % 2 == 1, -self.dy, self.dy)
+
+    def power_up_pickups(self):
+        """返回拾取掩码，形状 (M, N, P)：移动中的球与未收集的道具重叠
+
+        效果的应用（以及由此引起的半径变化）由调用方处理
+        """
+        pickups = np.zeros((self.games, self.balls_per_game, self.power_up_x.shape[0]), dtype=bool)
+        if pickups.size == 0:
+            return pickups
+
+        # hypot(dx, dy) 不小于 |dx| 和 |dy|，先按坐标差粗筛 (N, P, M) 不会漏掉任何拾取；
+        # hypot 只取决于绝对值，因此可以原地取绝对值
+        offset_x = self.x[:, None, :] - self.power_up_x[None, :, :]
+        offset_y = self.y[:, None, :] - self.power_up_y[None, :, :]
+        np.abs(offset_x, out=offset_x)
+        np.abs(offset_y, out=offset_y)
+        reach = self.radius[:, None, :] + self.power_up_radius[None, :, :]
+        near = offset_x < reach
+        near &= offset_y < reach
+        index = np.flatnonzero(near)
+        n, p, m = np.unravel_index(index, near.shape)
+        distance = np.hypot(offset_x.flat[index], offset_y.flat[index])
+        pickups[m, n, p] = ((distance < reach.flat[index]) &
+                            self.power_up_active[p, m] & self.moving[n, m])
+        return pickups
+
+    def step(self):
+        """推进一步：移动、障碍物反弹，返回道具拾取掩码"""
+        self.step_motion()
+        self.bounce_obstacles()
+        return self.power_up_pickups()
@@ -0,0 +1,206 @@
+# 性能基准：在 SDL dummy 显示驱动下测量模拟步速、整帧 / 脏矩形绘制耗时和瞄准箭头的绘制开销，
+# 按障碍物数量、道具数量、生效中的效果数量扫描，结果写入 JSON，并可与保存的基线比较
+#
+#   python benchmarks/bench.py                        运行并打印结果
+#   python benchmarks/bench.py -o results.json        同时写入文件
+#   python benchmarks/bench.py --compare              与 benchmarks/baseline.json 比较，有回退时返回 1
+#   python benchmarks/bench.py --save-baseline        把本次结果保存为基线
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simulation
+from simulation import PowerUpType, WINDOW_WIDTH, WINDOW_HEIGHT, obstacle_bounds
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25  # 比基线慢 25% 以上视为回退
+
+OBSTACLE_COUNTS = (0, 10, 40)
+POWER_UP_COUNTS = (0, 10)
+EFFECT_COUNTS = (0, 3)
+# 按顺序施加的持续效果
+EFFECTS = (PowerUpType.SIZE_UP, PowerUpType.SPEED_UP, PowerUpType.POWER_UP)
+
+def setup_game(game, obstacles, power_ups, effects, seed=0):
+    """把对局布置为指定数量的障碍物、道具和生效中的效果"""
+    random.seed(seed)
+    game.obstacles.clear()
+    game.obstacle_index.clear()
+    while len(game.obstacles) < obstacles:
+        width = random.randint(30, 80)
+        height = random.randint(30, 80)
+        obstacle = game.obstacle_class(random.randint(0, WINDOW_WIDTH - width),
+                                       random.randint(0, WINDOW_HEIGHT - height), width, height)
+        game.obstacles.append(obstacle)
+        game.obstacle_index.insert(obstacle, *obstacle_bounds(obstacle))
+    game.line_of_sight.set_obstacles(game.obstacles)
+    if hasattr(game, 'background'):
+        game.background.build(game.obstacles)
+
+    game.clear_power_ups()
+    game.max_power_ups = max(game.max_power_ups, power_ups)
+    while len(game.power_ups) < power_ups:
+        game.try_generate_new_powerup(game.clock.get_ticks())
+    game.power_ups.set_lifetime(10 ** 9)  # 测量期间不过期
+    game.powerup_interval = 10 ** 9  # 测量期间不生成新道具
+
+    for ball in (game.player_ball, game.computer_ball):
+        for effect_type in EFFECTS[:effects]:
+            ball.apply_effect(effect_type, duration=10 ** 9)
+
+def keep_moving(game):
+    """球停下后重新随机发射，使每一步都在推进物理"""
+    for ball in (game.player_ball, game.computer_ball):
+        if not ball.is_moving:
+            ball.angle = random.uniform(0, 360)
+            ball.power = random.uniform(50, ball.max_power)
+            ball.shoot()
+
+def measure(run, iterations, repeats=7):
+    """每次重复执行 run() iterations 次，返回单次耗时（秒）的最小值
+
+    取最小值而不是平均值：其他进程的干扰只会让耗时变长，最小值最接近代码本身的开销
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        times.append((time.perf_counter() - start) / iterations)
+    return min(times)
+
+def bench_update(obstacles, power_ups, effects):
+    game = simulation.Game()
+    setup_game(game, obstacles, power_ups, effects)
+
+    def run():
+        keep_moving(game)
+        game.update()
+    return measure(run, 500)
+
+def bench_draw(obstacles, power_ups, effects, dirty):
+    import Pencil
+    screen = Pencil.init()
+    game = Pencil.Game()
+    setup_game(game, obstacles, power_ups, effects)
+    game.player_ball.is_aiming = True  # 包含箭头绘制
+
+    def run():
+        keep_moving(game)
+        game.update()
+        if dirty:
+            game.draw_dirty(screen)
+        else:
+            game.draw(screen)
+    return measure(run, 100)
+
+def bench_arrow(cached):
+    """cached 为 False 时每次都重新合成箭头；为 True 时在 36 个角度间循环，全部命中缓存"""
+    import Pencil
+    screen = Pencil.init()
+    ball = Pencil.Ball(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2, simulation.BLUE, simulation.GameClock())
+    ball.is_power_adjusting = True
+    ball.power = 120
+    frames = iter(range(10 ** 9))
+
+    def run():
+        if not cached:
+            Pencil.arrow_cache.clear()
+        ball.angle = next(frames) * 10 % 360
+        ball.draw_direction_arrow(screen)
+    if cached:
+        for _ in range(36):
+            run()  # 预热缓存
+    return measure(run, 200)
+
+def benchmark_cases():
+    """[(名称, 基准函数), ...]"""
+    cases = []
+    for obstacles in OBSTACLE_COUNTS:
+        for power_ups in POWER_UP_COUNTS:
+            for effects in EFFECT_COUNTS:
+                params = f"obstacles={obstacles},power_ups={power_ups},effects={effects}"
+                cases.append((f"update[{params}]", lambda o=obstacles, p=power_ups, e=effects: bench_update(o, p, e)))
+                cases.append((f"draw_full[{params}]", lambda o=obstacles, p=power_ups, e=effects: bench_draw(o, p, e, False)))
+                cases.append((f"draw_dirty[{params}]", lambda o=obstacles, p=power_ups, e=effects: bench_draw(o, p, e, True)))
+    cases.append(("arrow[cached=False]", lambda: bench_arrow(False)))
+    cases.append(("arrow[cached=True]", lambda: bench_arrow(True)))
+    return cases
+
+def run_benchmarks(selected=None, names=None):
+    """运行全部（或名字包含 selected、或名字在 names 中的）基准，返回 {名称: 单次耗时（秒）}"""
+    results = {}
+    for name, bench in benchmark_cases():
+        if selected and selected not in name:
+            continue
+        if names is not None and name not in names:
+            continue
+        results[name] = bench()
+    return results
+
+def compare(results, baseline, threshold):
+    """返回回退列表 [(名称, 基线, 本次, 比值)]"""
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference and seconds > reference * (1 + threshold):
+            regressions.append((name, reference, seconds, seconds / reference))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pencil 性能基准")
+    parser.add_argument('-o', '--output', help="结果 JSON 的路径")
+    parser.add_argument('-k', '--filter', help="只运行名字包含该字符串的基准")
+    parser.add_argument('--compare', action='store_true', help="与基线比较，有回退时返回 1")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="基线 JSON 的路径")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="允许的变慢比例")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为基线")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter)
+    for name, seconds in results.items():
+        print(f"{name:<60} {seconds * 1e6:10.1f} us")
+
+    report = {
+        'unit': 'seconds',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"基线已保存: {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        # 偶发的干扰可能造成误报：回退的基准再测两次，取最小值
+        for _ in range(2):
+            if not regressions:
+                break
+            retry = run_benchmarks(names={name for name, _, _, _ in regressions})
+            for name, seconds in retry.items():
+                results[name] = min(results[name], seconds)
+            regressions = compare(results, baseline, args.threshold)
+        for name, reference, seconds, ratio in regressions:
+            print(f"回退: {name} {reference * 1e6:.1f} us -> {seconds * 1e6:.1f} us ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"没有超过 {args.threshold:.0%} 的回退")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
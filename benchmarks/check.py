@@ -0,0 +1,209 @@
+# 正确性检查：各项优化声称与原先实现结果一致的地方，在这里用固定种子逐项比对
+#
+#   python benchmarks/check.py              运行全部检查，有不一致时返回 1
+#   python benchmarks/check.py -k batch     只运行名字包含 batch 的检查
+#
+#   batch_physics  BatchPhysics 与离散碰撞模式下逐个调用 Ball.update 的位置、速度、停止状态和道具拾取逐位一致
+#   power_ups      道具较多时向量化的拾取检测与逐个比较的结果相同，包括拾取「回到起点」后球被移走的情况
+#   dirty_rects    脏矩形绘制后窗口的每个像素与整屏重绘相同
+#   replay         录像保存、载入后回放（无界面的 Game 和带绘制的 Pencil.Game）得到与录制时相同的状态摘要
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simulation
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT
+
+def check_batch_physics(games=100, steps=400, seed=3):
+    """M 局对局同时用 BatchPhysics 和逐个 Ball.update 推进，返回不一致的次数"""
+    from batch_physics import BatchPhysics
+
+    rng = random.Random(seed)
+    reference = []
+    for m in range(games):
+        game = simulation.Game(swept_collisions=False, rng=random.Random(seed * 1000 + m))
+        for _ in range(8):
+            game.try_generate_new_powerup(0)
+        for ball in (game.player_ball, game.computer_ball):
+            ball.x = rng.uniform(0, WINDOW_WIDTH)
+            ball.y = rng.uniform(0, WINDOW_HEIGHT)
+            ball.angle = rng.uniform(0, 360)
+            ball.power = rng.uniform(30, 150)
+            ball.radius = rng.choice([12.5, 25, 50])  # 缩小、正常、增大三种半径
+            ball.shoot()
+        reference.append(game)
+
+    batch = BatchPhysics.from_games(reference)
+    mismatches = 0
+    for _ in range(steps):
+        pickups = batch.step()
+        for m, game in enumerate(reference):
+            for n, ball in enumerate((game.player_ball, game.computer_ball)):
+                ball.update()
+                if ball.is_moving:
+                    game.check_obstacle_collisions(ball)
+                    for p, power_up in enumerate(game.power_ups):
+                        hit = (not power_up.collected and
+                               math.hypot(ball.x - power_up.x, ball.y - power_up.y) < ball.radius + power_up.radius)
+                        mismatches += hit != bool(pickups[m, n, p])
+                state = (batch.x[n, m], batch.y[n, m], batch.dx[n, m], batch.dy[n, m], batch.moving[n, m])
+                mismatches += (ball.x, ball.y, ball.dx, ball.dy, ball.is_moving) != state
+    return mismatches
+
+def power_up_scene(game, rng, count):
+    """在两个球的当前位置和起点附近放置 count 个道具，其中一部分是「回到起点」"""
+    spots = []
+    for ball in (game.player_ball, game.computer_ball):
+        spots += [(ball.x, ball.y), (ball.original_x, ball.original_y)]
+    for _ in range(count):
+        x, y = rng.choice(spots)
+        power_up = game.new_power_up(x + rng.uniform(-60, 60), y + rng.uniform(-60, 60))
+        power_up.type = rng.choice([simulation.PowerUpType.RESET_POSITION] + list(simulation.PowerUpType))
+        power_up.is_mystery = False
+        game.power_ups.add(power_up)
+
+def check_power_ups(scenes=300, count=40, seed=21):
+    """同一场景分别用向量化和逐个比较的路径检测拾取，返回道具、球和回合状态不同的场景数
+
+    第一个场景固定为：球压在「回到起点」道具上，起点处还有另一个道具，其余道具都在远处
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    for scene in range(scenes):
+        results = []
+        for scalar in (False, True):
+            game = simulation.Game(rng=random.Random(scene))
+            game.clear_power_ups()
+            ball = game.player_ball
+            if scene == 0:
+                ball.x, ball.y = ball.original_x + 300, ball.original_y
+                for x, y, kind in [(ball.x, ball.y, simulation.PowerUpType.RESET_POSITION),
+                                   (ball.original_x, ball.original_y, simulation.PowerUpType.SIZE_UP)]:
+                    power_up = game.new_power_up(x, y)
+                    power_up.type = kind
+                    power_up.is_mystery = False
+                    game.power_ups.add(power_up)
+                while len(game.power_ups) < count:
+                    power_up = game.new_power_up(WINDOW_WIDTH - 20, 20)
+                    power_up.type = simulation.PowerUpType.SPEED_UP
+                    power_up.is_mystery = False
+                    game.power_ups.add(power_up)
+            else:
+                scene_rng = random.Random(seed * 1000 + scene)
+                for moved in (game.player_ball, game.computer_ball):
+                    moved.x = scene_rng.uniform(0, WINDOW_WIDTH)
+                    moved.y = scene_rng.uniform(0, WINDOW_HEIGHT)
+                power_up_scene(game, scene_rng, count)
+            limit = simulation.SCALAR_POWER_UPS
+            simulation.SCALAR_POWER_UPS = count if scalar else 0
+            try:
+                game.check_power_up_collisions([game.player_ball, game.computer_ball])
+            finally:
+                simulation.SCALAR_POWER_UPS = limit
+            results.append(([power_up.collected for power_up in game.power_ups],
+                            [(b.x, b.y, b.radius, b.max_power, b.rotation_speed)
+                             for b in (game.player_ball, game.computer_ball)],
+                            game.current_turn))
+        mismatches += results[0] != results[1]
+    return mismatches
+
+def check_dirty_rects(frames=1500, seed=5):
+    """同一局每步分别用 draw_dirty 和 draw 绘制到两个 surface，返回像素不同的帧数
+
+    对局中途按固定节奏施加输入、生成道具和效果，覆盖瞄准、蓄力、移动、拾取和效果计时的绘制
+    """
+    import pygame
+    import Pencil
+
+    Pencil.init()
+    game = Pencil.Game(rng=random.Random(seed))
+    size = (WINDOW_WIDTH, WINDOW_HEIGHT)
+    dirty = pygame.Surface(size).convert()
+    full = pygame.Surface(size).convert()
+    mismatches = 0
+    for frame in range(frames):
+        if frame % 97 == 0:
+            game.press_space()
+        if frame % 300 == 0:
+            for _ in range(4):
+                game.try_generate_new_powerup(0)
+        if frame % 500 == 0:
+            game.player_ball.apply_effect(simulation.PowerUpType.SIZE_UP)
+        game.update()
+        game.draw_dirty(dirty)
+        game.draw(full)
+        mismatches += pygame.image.tobytes(dirty, 'RGB') != pygame.image.tobytes(full, 'RGB')
+    return mismatches
+
+def check_replay(matches=5, frames=8000, seed=99, interval=100):
+    """录制若干局随机输入的对局，经文件保存、载入后回放，返回状态摘要不同的次数
+
+    除结束时的摘要外，每 interval 步比较一次中间状态，中途分叉后又重新开局的情况也能发现；
+    录制期间消耗全局 random 的随机数，确认对局只依赖自己的随机数来源
+    """
+    import replay
+    import Pencil
+
+    rng = random.Random(seed)
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'match.json')
+        for match in range(matches):
+            recorder = replay.Recorder(seed=match * 7 + 1)
+            game = recorder.create_game()
+            recorded = []
+            for _ in range(frames):
+                if rng.random() < 0.01:
+                    recorder.press_space()
+                random.random()
+                game.update()
+                if game.clock.frame % interval == 0:
+                    recorded.append(replay.state_digest(game))
+            recorder.finish().save(path)
+            recording = replay.Recording.load(path)
+
+            for game_class in (simulation.Game, Pencil.Game):
+                replayed = []
+
+                def checkpoint(game):
+                    if game.clock.frame % interval == 0:
+                        replayed.append(replay.state_digest(game))
+                final = replay.replay(recording, game_class, checkpoint)
+                mismatches += replay.state_digest(final) != recording.digest
+                mismatches += sum(a != b for a, b in zip(recorded, replayed)) + abs(len(recorded) - len(replayed))
+    return mismatches
+
+CHECKS = (
+    ('batch_physics', check_batch_physics),
+    ('power_ups', check_power_ups),
+    ('dirty_rects', check_dirty_rects),
+    ('replay', check_replay),
+)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pencil 正确性检查")
+    parser.add_argument('-k', '--filter', help="只运行名字包含该字符串的检查")
+    args = parser.parse_args(argv)
+
+    failed = []
+    for name, check in CHECKS:
+        if args.filter and args.filter not in name:
+            continue
+        mismatches = check()
+        print(f"{name:<20} {'一致' if not mismatches else f'{mismatches} 处不一致'}")
+        if mismatches:
+            failed.append(name)
+    if failed:
+        print(f"未通过: {', '.join(failed)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# 内存测量：每个实体（球、道具、障碍物）占用的字节数，以及模拟每一步的临时分配量
+#
+#   python benchmarks/memory.py
+#
+# 实体内存用 tracemalloc 统计创建 N 个实体前后的差值；每步的分配量为该步内 tracemalloc 记录的
+# 峰值减去步开始时的用量（临时对象在步内分配又释放，只能用峰值观察），以及该步结束时净增的内存块数
+import argparse
+import random
+import sys
+import tracemalloc
+
+from bench import keep_moving, setup_game
+
+import simulation
+
+def entity_size(create, count=1000):
+    """创建 count 个实体，返回平均每个实体的字节数"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [create(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entities
+    return (after - before) / count
+
+def entity_sizes():
+    clock = simulation.GameClock()
+    rng = random.Random(0)
+    return {
+        'Ball': entity_size(lambda i: simulation.Ball(i, i, simulation.BLUE, clock, rng)),
+        'PowerUp': entity_size(lambda i: simulation.PowerUp(i, i, clock, rng)),
+        'Obstacle': entity_size(lambda i: simulation.Obstacle(i, i, 40, 40)),
+    }
+
+def churn(game):
+    """把全部道具标记为已收集，并让每一步都尝试生成新道具"""
+    for index in range(len(game.power_ups)):
+        game.power_ups.collect(index)
+    game.powerup_interval_range = (0, 0)
+    game.powerup_interval = 0
+
+def frame_allocations(obstacles=10, power_ups=10, effects=3, frames=2000, warmup=200, spawns=False):
+    """返回 (每步临时分配的平均字节数, 每步净增的平均内存块数)；spawns 为 True 时每步都有道具被收集和生成"""
+    game = simulation.Game()
+    setup_game(game, obstacles, power_ups, effects)
+
+    def step():
+        keep_moving(game)
+        if spawns:
+            churn(game)
+    for _ in range(warmup):
+        step()
+        game.update()
+
+    tracemalloc.start()
+    transient = 0
+    start_blocks = sys.getallocatedblocks()
+    for _ in range(frames):
+        step()
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        game.update()
+        transient += tracemalloc.get_traced_memory()[1] - current
+    blocks = sys.getallocatedblocks() - start_blocks
+    tracemalloc.stop()
+    return transient / frames, blocks / frames
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="实体内存与每步分配量")
+    parser.add_argument('--frames', type=int, default=2000, help="测量的步数")
+    args = parser.parse_args(argv)
+
+    sizes = entity_sizes()
+    steady = frame_allocations(frames=args.frames)
+    spawning = frame_allocations(frames=args.frames, spawns=True)
+    for name, size in sizes.items():
+        print(f"{name:<10} {size:8.0f} B/个")
+    for name, (transient, blocks) in (('稳定', steady), ('道具频繁生成', spawning)):
+        print(f"{name}：每步临时分配 {transient:8.0f} B，净增 {blocks:.2f} 块")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# 连续（扫掠）碰撞检测：求圆沿位移线段运动时与矩形障碍物、窗口边界的最早接触时间，
+# 在接触点按法线反射速度，剩余位移沿反射方向继续，一步之内可以发生多次反弹
+# 快速移动的球不会穿透薄障碍物，反弹后也不会因仍与障碍物重叠而在下一帧再次翻转
+import math
+
+MAX_BOUNCES = 8  # 一步之内最多处理的反弹次数
+TOI_EPSILON = 1e-9  # 接触时间的容差，起点恰好在表面上时也算接触
+
+def reflect(dx, dy, nx, ny):
+    """按单位法线 (nx, ny) 反射向量"""
+    dot = dx * nx + dy * ny
+    return dx - 2 * dot * nx, dy - 2 * dot * ny
+
+def sweep_circle_rect(x, y, dx, dy, radius, left, top, right, bottom):
+    """圆心从 (x, y) 沿 (dx, dy) 移动时与矩形的首次接触
+
+    返回 (t, nx, ny)，t 为位移的比例（0~1），(nx, ny) 为接触处的外法线；
+    不接触、或在接触点正在远离矩形时返回 None
+    """
+    best = None
+    # 四条边：矩形向外扩展 radius 后的边，只在边的范围内有效
+    if dx > 0:
+        t = (left - radius - x) / dx
+        if -TOI_EPSILON <= t <= 1 and top <= y + dy * t <= bottom:
+            best = (t, -1.0, 0.0)
+    elif dx < 0:
+        t = (right + radius - x) / dx
+        if -TOI_EPSILON <= t <= 1 and top <= y + dy * t <= bottom:
+            best = (t, 1.0, 0.0)
+    if dy > 0:
+        t = (top - radius - y) / dy
+        if -TOI_EPSILON <= t <= 1 and left <= x + dx * t <= right and (best is None or t < best[0]):
+            best = (t, 0.0, -1.0)
+    elif dy < 0:
+        t = (bottom + radius - y) / dy
+        if -TOI_EPSILON <= t <= 1 and left <= x + dx * t <= right and (best is None or t < best[0]):
+            best = (t, 0.0, 1.0)
+
+    # 四个角：以角点为圆心、radius 为半径的圆
+    a = dx * dx + dy * dy
+    if a == 0:
+        return best
+    for corner_x, corner_y in ((left, top), (right, top), (right, bottom), (left, bottom)):
+        offset_x = x - corner_x
+        offset_y = y - corner_y
+        b = offset_x * dx + offset_y * dy
+        if b >= 0:
+            continue  # 正在远离该角
+        c = offset_x * offset_x + offset_y * offset_y - radius * radius
+        discriminant = b * b - a * c
+        if discriminant < 0:
+            continue
+        t = (-b - math.sqrt(discriminant)) / a
+        if -TOI_EPSILON <= t <= 1 and (best is None or t < best[0]):
+            hit_x = offset_x + dx * t
+            hit_y = offset_y + dy * t
+            length = math.hypot(hit_x, hit_y)
+            if length > 0:
+                best = (t, hit_x / length, hit_y / length)
+    return best
+
+def sweep_circle_walls(x, y, dx, dy, radius, width, height):
+    """圆沿 (dx, dy) 移动时与窗口边界的首次接触，返回 (t, nx, ny) 或 None"""
+    best = None
+    if dx < 0:
+        t = (radius - x) / dx
+        if -TOI_EPSILON <= t <= 1:
+            best = (t, 1.0, 0.0)
+    elif dx > 0:
+        t = (width - radius - x) / dx
+        if -TOI_EPSILON <= t <= 1:
+            best = (t, -1.0, 0.0)
+    if dy < 0:
+        t = (radius - y) / dy
+        if -TOI_EPSILON <= t <= 1 and (best is None or t < best[0]):
+            best = (t, 0.0, 1.0)
+    elif dy > 0:
+        t = (height - radius - y) / dy
+        if -TOI_EPSILON <= t <= 1 and (best is None or t < best[0]):
+            best = (t, 0.0, -1.0)
+    return best
+
+def push_out_of_rect(x, y, radius, left, top, right, bottom):
+    """圆与矩形重叠时沿最短方向推出，返回 (x, y, nx, ny)；不重叠时返回 None"""
+    nearest_x = min(max(x, left), right)
+    nearest_y = min(max(y, top), bottom)
+    offset_x = x - nearest_x
+    offset_y = y - nearest_y
+    distance = math.hypot(offset_x, offset_y)
+    if distance >= radius:
+        return None
+    if distance > 0:
+        nx, ny = offset_x / distance, offset_y / distance
+        return nearest_x + nx * radius, nearest_y + ny * radius, nx, ny
+
+    # 圆心在矩形内部：从最近的边推出
+    exits = (
+        (x - left, -1.0, 0.0),
+        (right - x, 1.0, 0.0),
+        (y - top, 0.0, -1.0),
+        (bottom - y, 0.0, 1.0),
+    )
+    depth, nx, ny = min(exits)
+    return x + nx * (depth + radius), y + ny * (depth + radius), nx, ny
+
+class SweptCollider:
+    """在障碍物空间索引和窗口边界之间移动球"""
+
+    def __init__(self, obstacle_index, width, height):
+        self.obstacle_index = obstacle_index
+        self.width = width
+        self.height = height
+
+    def resolve_penetration(self, x, y, dx, dy, radius):
+        """把与边界或障碍物重叠的球推出（例如球变大之后），朝向障碍物的速度分量被反射"""
+        x = max(radius, min(x, self.width - radius))
+        y = max(radius, min(y, self.height - radius))
+        for obstacle in self.obstacle_index.query_aabb(x - radius, y - radius, x + radius, y + radius):
+            rect = obstacle.rect
+            pushed = push_out_of_rect(x, y, radius, rect.left, rect.top, rect.right, rect.bottom)
+            if pushed is not None:
+                x, y, nx, ny = pushed
+                if dx * nx + dy * ny < 0:
+                    dx, dy = reflect(dx, dy, nx, ny)
+        return x, y, dx, dy
+
+    def first_hit(self, x, y, dx, dy, radius):
+        """沿位移 (dx, dy) 的首次接触，返回 (t, nx, ny) 或 None"""
+        best = sweep_circle_walls(x, y, dx, dy, radius, self.width, self.height)
+        candidates = self.obstacle_index.query_aabb(
+            min(x, x + dx) - radius, min(y, y + dy) - radius,
+            max(x, x + dx) + radius, max(y, y + dy) + radius)
+        for obstacle in candidates:
+            rect = obstacle.rect
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            hit = sweep_circle_rect(x, y, dx, dy, radius, rect.left, rect.top, rect.right, rect.bottom)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+        return best
+
+    def sweep(self, x, y, dx, dy, radius, scale=1.0, normals=None):
+        """圆心从 (x, y) 以速度 (dx, dy) 移动 scale 倍速度的距离，遇到表面即反射
+
+        返回 (x, y, dx, dy, points)，points 为途经的反弹点 [(x, y), ...]；
+        normals 为列表时按相同顺序追加各反弹处表面的单位外法线 (nx, ny)
+        """
+        move_x = dx * scale
+        move_y = dy * scale
+        points = []
+        for _ in range(MAX_BOUNCES):
+            hit = self.first_hit(x, y, move_x, move_y, radius)
+            if hit is None:
+                break
+            t, nx, ny = hit
+            t = max(t, 0.0)
+            x += move_x * t
+            y += move_y * t
+            move_x, move_y = reflect(move_x * (1 - t), move_y * (1 - t), nx, ny)
+            dx, dy = reflect(dx, dy, nx, ny)
+            points.append((x, y))
+            if normals is not None:
+                normals.append((nx, ny))
+        else:
+            # 反弹次数用完（例如卡在狭窄的缝隙中），剩余位移放弃
+            move_x = move_y = 0.0
+        return x + move_x, y + move_y, dx, dy, points
+
+    def move(self, x, y, dx, dy, radius):
+        """推进一帧的位移（先推出重叠），返回新的 (x, y, dx, dy)"""
+        x, y, dx, dy = self.resolve_penetration(x, y, dx, dy, radius)
+        x, y, dx, dy, _ = self.sweep(x, y, dx, dy, radius)
+        return x, y, dx, dy
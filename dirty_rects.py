@@ -0,0 +1,77 @@
+# 脏矩形渲染：只恢复并重绘发生变化的区域，用 pygame.display.update(rects) 提交，
+# 变化面积超过阈值时退回整屏刷新
+import pygame
+
+class DirtyRectTracker:
+    def __init__(self, screen_size, full_flip_ratio=0.5):
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.full_flip_ratio = full_flip_ratio  # 脏区域占屏幕比例超过该值时整屏刷新
+        self.previous = None  # 上一帧各元素的 {key: (rect, signature)}
+        self.background = None  # 上一帧使用的静态层
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """下一帧强制整屏重绘（例如被遮罩覆盖之后）"""
+        self.previous = None
+
+    def render(self, screen, background, items):
+        """绘制一帧，返回需要提交的矩形列表；返回 None 表示应整屏刷新
+
+        items 按绘制顺序排列，每项为 (key, rect, signature, draw)：
+        rect 覆盖该元素绘制的全部像素，signature 相同表示外观没有变化
+        """
+        current = {key: (rect, signature) for key, rect, signature, _ in items}
+
+        if self.previous is None or background is not self.background:
+            return self._render_full(screen, background, items, current)
+
+        # 新出现、移动或外观变化的元素：新旧位置都需要重绘
+        dirty = []
+        for key, rect, signature, _ in items:
+            previous = self.previous.get(key)
+            if previous != (rect, signature):
+                dirty.append(rect)
+                if previous is not None:
+                    dirty.append(previous[0])
+        # 消失的元素：旧位置需要恢复
+        for key, (rect, _) in self.previous.items():
+            if key not in current:
+                dirty.append(rect)
+
+        # 与脏区域相交的元素也会被恢复背景覆盖，需要整体重绘，直到不再扩大
+        redraw = [False] * len(items)
+        expanded = True
+        while expanded:
+            expanded = False
+            for index, (_, rect, _, _) in enumerate(items):
+                if not redraw[index] and rect.collidelist(dirty) != -1:
+                    redraw[index] = True
+                    dirty.append(rect)
+                    expanded = True
+
+        dirty = [rect.clip(self.screen_rect) for rect in dirty]
+        dirty = [rect for rect in dirty if rect.width > 0 and rect.height > 0]
+        area = sum(rect.width * rect.height for rect in dirty)
+        if area > self.full_flip_ratio * self.screen_rect.width * self.screen_rect.height:
+            return self._render_full(screen, background, items, current)
+
+        # 从静态层恢复脏区域，再按顺序重绘受影响的元素
+        for rect in dirty:
+            screen.blit(background, rect, rect)
+        for index, (_, _, _, draw) in enumerate(items):
+            if redraw[index]:
+                draw(screen)
+
+        self.previous = current
+        self.partial_frames += 1
+        return dirty
+
+    def _render_full(self, screen, background, items, current):
+        screen.blit(background, (0, 0))
+        for _, _, _, draw in items:
+            draw(screen)
+        self.previous = current
+        self.background = background
+        self.full_frames += 1
+        return None
@@ -0,0 +1,129 @@
+# 事件总线：模拟核心的游戏事件（发射、收集道具、效果生效与结束、回合切换、对局结束）按级别发布，
+# 取代原先逐事件同步 print() 的调试输出。默认没有接收器，发布方先比较 bus.min_level 再构造事件，
+# 热路径上只有一次属性比较，不格式化字符串也不写 stdout
+#
+# 事件为 (模拟时间, 级别, 名称, 字段)，字段只含数字、字符串和布尔值，可以直接序列化为 JSON。接收器：
+#   RingBufferSink  保留最近 N 条事件，供调试时查看
+#   AsyncFileSink   由后台线程按 JSON Lines 写入文件，队列满时丢弃而不阻塞模拟
+#   ConsoleSink     格式化后打印到 stdout（交互调试用）
+import json
+import math
+import queue
+import threading
+
+from profiler import RingBuffer
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+class Event:
+    __slots__ = ('time', 'level', 'name', 'fields')
+
+    def __init__(self, time, level, name, fields):
+        self.time = time  # 模拟时间（毫秒）
+        self.level = level
+        self.name = name
+        self.fields = fields
+
+    def to_dict(self):
+        return {'time': self.time, 'level': LEVEL_NAMES.get(self.level, self.level),
+                'event': self.name, **self.fields}
+
+    def format(self):
+        """一行可读的文本"""
+        fields = " ".join(f"{key}={value}" for key, value in self.fields.items())
+        return f"[{self.time:>9} ms] {LEVEL_NAMES.get(self.level, self.level):<7} {self.name} {fields}"
+
+class EventBus:
+    def __init__(self):
+        self.sinks = []  # [(接收器, 最低级别)]
+        self.min_level = math.inf  # 所有接收器中最低的级别，没有接收器时为无穷大
+
+    def enabled(self, level):
+        """level 级别的事件是否有接收器；发布方在构造事件前检查"""
+        return level >= self.min_level
+
+    def add_sink(self, sink, level=INFO):
+        """登记接收器 sink(event)，只接收不低于 level 的事件"""
+        self.sinks.append((sink, level))
+        self.min_level = min(self.min_level, level)
+        return sink
+
+    def remove_sink(self, sink):
+        self.sinks = [(s, level) for s, level in self.sinks if s is not sink]
+        self.min_level = min((level for _, level in self.sinks), default=math.inf)
+
+    def emit(self, level, name, time, **fields):
+        """发布事件；调用方通常先检查 bus.min_level <= level，避免构造字段"""
+        if level < self.min_level:
+            return
+        event = Event(time, level, name, fields)
+        for sink, sink_level in self.sinks:
+            if level >= sink_level:
+                sink(event)
+
+class RingBufferSink:
+    """保留最近 capacity 条事件"""
+
+    def __init__(self, capacity=1024):
+        self.buffer = RingBuffer(capacity)
+
+    def __call__(self, event):
+        self.buffer.append(event)
+
+    def events(self):
+        """按发生先后排列的事件"""
+        return self.buffer.samples()
+
+class ConsoleSink:
+    """把事件格式化后打印到 stdout"""
+
+    def __call__(self, event):
+        print(event.format())
+
+class AsyncFileSink:
+    """由后台线程把事件按 JSON Lines 追加到文件；发布方只做一次入队，队列满时丢弃并计数"""
+
+    def __init__(self, path, max_queue=10000):
+        self.path = path
+        self.queue = queue.Queue(max_queue)
+        self.dropped = 0
+        self.file = open(path, 'a', encoding='utf-8')
+        self.thread = threading.Thread(target=self.run, name="event-writer", daemon=True)
+        self.thread.start()
+
+    def __call__(self, event):
+        try:
+            self.queue.put_nowait(event.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        """后台线程：取出队列中已有的全部事件后一次写入"""
+        while True:
+            record = self.queue.get()
+            lines = []
+            while record is not None:
+                lines.append(json.dumps(record, ensure_ascii=False))
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if lines:
+                self.file.write("\n".join(lines) + "\n")
+                self.file.flush()
+            if record is None:
+                return
+
+    def close(self):
+        """写完队列中的事件并关闭文件"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            self.file.close()
+
+bus = EventBus()  # 默认的总线，Game 未指定 events 时使用
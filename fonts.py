@@ -0,0 +1,64 @@
+# 进程内共享的字体注册表：中文字体文件的路径只查找一次，pygame.font.Font 按 (路径, 字号) 缓存，
+# 道具、按钮、信息面板和球的效果图标共用同一批字体对象，生成道具时不再读取字体文件
+import os
+import time
+
+import pygame
+
+# Windows 系统中文字体，按优先顺序查找
+CHINESE_FONT_PATHS = [
+    "C:\\Windows\\Fonts\\msyh.ttc",  # 微软雅黑
+    "C:\\Windows\\Fonts\\simhei.ttf",  # 黑体
+    "C:\\Windows\\Fonts\\simsun.ttc",  # 宋体
+]
+FALLBACK_SYSFONT = 'microsoftyahei'  # 找不到上述文件时按名字查找的系统字体
+
+def find_chinese_font():
+    """返回中文字体文件的路径；都找不到时返回 None（使用 pygame 默认字体）"""
+    for path in CHINESE_FONT_PATHS:
+        if os.path.exists(path):
+            return path
+    try:
+        return pygame.font.match_font(FALLBACK_SYSFONT)
+    except Exception:
+        return None
+
+class FontRegistry:
+    def __init__(self):
+        self.fonts = {}  # (路径, 字号) -> pygame.font.Font，路径为 None 表示默认字体
+        self.chinese_path = None
+        self.resolved = False  # 中文字体路径是否已查找
+        self.load_time = 0.0  # 查找路径和加载字体文件的累计耗时（秒）
+
+    def get(self, path, size):
+        """返回 (path, size) 对应的字体，首次使用时加载；加载失败时退回默认字体"""
+        font = self.fonts.get((path, size))
+        if font is None:
+            start = time.perf_counter()
+            if not pygame.font.get_init():
+                pygame.font.init()
+            try:
+                font = pygame.font.Font(path, size)
+            except Exception:
+                font = pygame.font.Font(None, size)
+            self.fonts[(path, size)] = font
+            self.load_time += time.perf_counter() - start
+        return font
+
+    def chinese(self, size):
+        """中文字体"""
+        if not self.resolved:
+            start = time.perf_counter()
+            self.chinese_path = find_chinese_font()
+            self.resolved = True
+            self.load_time += time.perf_counter() - start
+        return self.get(self.chinese_path, size)
+
+    def default(self, size):
+        """pygame 默认字体"""
+        return self.get(None, size)
+
+    def clear(self):
+        self.fonts.clear()
+        self.chinese_path = None
+        self.resolved = False
@@ -0,0 +1,38 @@
+# 固定步长的游戏时钟
+# 模拟中所有计时（道具寿命、效果持续时间、道具生成间隔）都读取这里的时间，
+# 而不是墙钟时间，因此结果与帧率无关，也可以不受实时限制地全速推进
+# 到期类的计时登记在时钟的定时器队列中，时钟推进时触发已到期的回调
+from timers import TimerQueue
+
+TICK_RATE = 60  # 每秒模拟步数
+
+class GameClock:
+    def __init__(self, tick_rate=TICK_RATE):
+        self.tick_rate = tick_rate
+        self.frame = 0  # 已推进的步数
+        self.timers = TimerQueue()  # 按模拟时间（毫秒）到期的定时器
+
+    @property
+    def ms_per_tick(self):
+        """每一步对应的毫秒数"""
+        return 1000 / self.tick_rate
+
+    def tick(self, steps=1):
+        """推进若干步，并触发已到期的定时器"""
+        self.frame += steps
+        self.timers.run(self.get_ticks())
+
+    def advance(self, ms):
+        """推进至少 ms 毫秒的模拟时间"""
+        steps = -(-ms * self.tick_rate // 1000)  # 向上取整
+        self.frame += int(steps)
+        self.timers.run(self.get_ticks())
+
+    def get_ticks(self):
+        """当前模拟时间（毫秒），与 pygame.time.get_ticks 的单位一致"""
+        return self.frame * 1000 // self.tick_rate
+
+    def reset(self):
+        """回到时间零点，清空定时器"""
+        self.frame = 0
+        self.timers.clear()
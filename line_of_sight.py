@@ -0,0 +1,83 @@
+# 向量化视线检测：一次 NumPy 调用检测 K 条线段与全部障碍物矩形的四条边
+# 判定方式与逐条比较时相同：线段与某条边按叉积符号严格相交才算阻挡，完全位于矩形内部的线段不算；
+# 叉积的计算顺序也相同，因此与边共线、端点落在边上或穿过角的退化情况结果一致；
+# 同一次运算还给出每条线段最先碰到的边的位置参数 t（起点为 0、终点为 1），没有阻挡时为 inf
+import numpy as np
+
+def ccw(ax, ay, bx, by, cx, cy):
+    """A、B、C 三点是否按逆时针排列（共线时为 False）"""
+    return (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+
+def first_hits(x1, y1, x2, y2, sx, sy, ex, ey):
+    """K 条线段 (x1, y1)-(x2, y2) 与 E 条边 (sx, sy)-(ex, ey) 最先相交处的位置参数 t
+
+    线段参数为形状 (K,) 的数组，边的参数为形状 (E,) 的数组；返回形状 (K,) 的数组，
+    交点为 (x1 + t·(x2 - x1), y1 + t·(y2 - y1))，与任何边都不相交的线段为 inf
+    """
+    x1 = np.asarray(x1, dtype=float)[:, None]
+    y1 = np.asarray(y1, dtype=float)[:, None]
+    x2 = np.asarray(x2, dtype=float)[:, None]
+    y2 = np.asarray(y2, dtype=float)[:, None]
+    if len(sx) == 0:
+        return np.full(x1.shape[0], np.inf)
+    sx = sx[None, :]
+    sy = sy[None, :]
+    ex = ex[None, :]
+    ey = ey[None, :]
+    crosses = ((ccw(x1, y1, sx, sy, ex, ey) != ccw(x2, y2, sx, sy, ex, ey))
+               & (ccw(x1, y1, x2, y2, sx, sy) != ccw(x1, y1, x2, y2, ex, ey)))
+    # 线段与边所在直线的交点：t = (S - P) × (E - S) / ((Q - P) × (E - S))
+    edge_x = ex - sx
+    edge_y = ey - sy
+    denominator = (x2 - x1) * edge_y - (y2 - y1) * edge_x
+    numerator = (sx - x1) * edge_y - (sy - y1) * edge_x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip(numerator / denominator, 0.0, 1.0)
+    # 叉积判定相交而分母舍入为 0（几乎平行）时交点记为起点，保证 t < inf 与相交判定完全一致
+    t = np.where(crosses, np.nan_to_num(t, nan=0.0), np.inf)
+    return t.min(axis=1)
+
+def blocked(x1, y1, x2, y2, sx, sy, ex, ey):
+    """K 条线段是否与 E 条边中的任一条相交，参数同 first_hits，返回形状 (K,) 的布尔数组"""
+    return first_hits(x1, y1, x2, y2, sx, sy, ex, ey) < np.inf
+
+class LineOfSight:
+    """当前障碍物布局下的视线检测"""
+
+    def __init__(self):
+        self.set_obstacles([])
+
+    def set_obstacles(self, obstacles):
+        """载入新的障碍物布局：每个矩形按 上、右、下、左 的顺序展开为四条边"""
+        sx, sy, ex, ey = [], [], [], []
+        for obs in obstacles:
+            rect = obs.rect
+            corners = [(rect.left, rect.top), (rect.right, rect.top),
+                       (rect.right, rect.bottom), (rect.left, rect.bottom)]
+            for i in range(4):
+                sx.append(corners[i][0])
+                sy.append(corners[i][1])
+                ex.append(corners[(i + 1) % 4][0])
+                ey.append(corners[(i + 1) % 4][1])
+        self.sx = np.array(sx, dtype=float)
+        self.sy = np.array(sy, dtype=float)
+        self.ex = np.array(ex, dtype=float)
+        self.ey = np.array(ey, dtype=float)
+
+    def invalidate(self):
+        """障碍物布局即将变化"""
+        self.set_obstacles([])
+
+    def first_hits(self, x1, y1, x2s, y2s):
+        """从同一起点出发的若干线段各自最先碰到障碍物处的位置参数 t，没有阻挡时为 inf"""
+        count = len(x2s)
+        return first_hits(np.full(count, x1), np.full(count, y1), x2s, y2s,
+                          self.sx, self.sy, self.ex, self.ey)
+
+    def blocked(self, x1, y1, x2s, y2s):
+        """从同一起点出发的若干线段各自是否被障碍物阻挡"""
+        return self.first_hits(x1, y1, x2s, y2s) < np.inf
+
+    def is_blocked(self, x1, y1, x2, y2):
+        """线段是否被任一障碍物阻挡"""
+        return bool(self.blocked(x1, y1, [x2], [y2])[0])
@@ -0,0 +1,189 @@
+# 电脑的蒙特卡洛击球搜索：随机采样大量 (角度, 力量)，用闭式轨迹把每一击推演到停止，
+# 按结果打分（击中玩家、收集有利道具、避开不利道具、停在自己一击可及而对手难以击中的位置），
+# 在时间预算内返回得分最高的一击
+# 候选被分成若干批交给进程池并行评估，批之间互不依赖，评估速度随核数近似线性增长
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+
+from simulation import (ARROW_LENGTH_MIN, BALL_RADIUS, WINDOW_WIDTH, WINDOW_HEIGHT,
+                        Obstacle, PowerUpType, obstacle_bounds)
+from spatial import UniformGrid
+from collision import SweptCollider
+import trajectory
+
+HIT_SCORE = 1000  # 击中玩家即获胜
+# 停止位置的得分：停在自己一击可及的范围内（下一回合有机会击中）得 APPROACH_SCORE，
+# 停在对手一击可及的范围内按深入程度扣分，越靠近对手扣得越多（对手的角度误差在近处影响越小）。
+# 两者叠加后最好的位置在射程边缘：既保留出手机会，又让对手难以命中
+APPROACH_SCORE = 100
+THREAT_SCORE = 150
+# 收集各类道具的得分，正负与 PowerUpType 标注的好坏（道具的红绿颜色）一致，神秘道具效果随机，记为 0
+POWER_UP_SCORES = {
+    PowerUpType.SPEED_UP: -20,
+    PowerUpType.SPEED_DOWN: 20,
+    PowerUpType.POWER_UP: 40,
+    PowerUpType.POWER_DOWN: -40,
+    PowerUpType.SIZE_UP: -10,
+    PowerUpType.SIZE_DOWN: 10,
+    PowerUpType.RESET_POSITION: -60,
+    PowerUpType.RANDOM: 0,
+}
+
+# 难度：采样数、时间预算（秒）、执行时的角度误差（度）和力量精度，误差与 AI.calculate_shot 一致
+DIFFICULTY = {
+    'easy': {'samples': 64, 'time_budget': 0.01, 'angle_spread': 20, 'accuracy': 0.6},
+    'normal': {'samples': 256, 'time_budget': 0.03, 'angle_spread': 10, 'accuracy': 0.8},
+    'hard': {'samples': 1024, 'time_budget': 0.1, 'angle_spread': 5, 'accuracy': 0.95},
+}
+
+def capture_scene(game, ball, target):
+    """把评估所需的对局状态整理成可序列化的元组，供工作进程使用"""
+    reach = trajectory.shot_reach(ball.max_power) + BALL_RADIUS * 2
+    target_reach = trajectory.shot_reach(target.max_power) + BALL_RADIUS * 2
+    obstacles = tuple((obs.rect.left, obs.rect.top, obs.rect.width, obs.rect.height)
+                      for obs in game.obstacles)
+    power_ups = tuple((pu.x, pu.y, pu.radius, PowerUpType.RANDOM if pu.is_mystery else pu.type)
+                      for pu in game.power_ups if not pu.collected)
+    return ((ball.x, ball.y, ball.radius, reach), (target.x, target.y, target_reach), obstacles, power_ups)
+
+def build_collider(obstacles):
+    index = UniformGrid()
+    for rect in obstacles:
+        obstacle = Obstacle(*rect)
+        index.insert(obstacle, *obstacle_bounds(obstacle))
+    return SweptCollider(index, WINDOW_WIDTH, WINDOW_HEIGHT)
+
+def score_shot(path, player, power_ups, reach, player_reach, radius=BALL_RADIUS):
+    """对一条推演到停止的轨迹打分
+
+    player 为要击中的球的位置，reach、player_reach 分别为自己和对方一击可及的距离，
+    radius 为击球的球当前的半径（受增大、缩小效果影响），决定能否碰到道具
+    """
+    if path.closest_approach(*player) < BALL_RADIUS * 2:
+        return HIT_SCORE
+    score = 0
+    for x, y, power_up_radius, effect_type in power_ups:
+        if path.closest_approach(x, y) < radius + power_up_radius:
+            score += POWER_UP_SCORES[effect_type]
+    end_x, end_y = path.end
+    distance = math.hypot(end_x - player[0], end_y - player[1])
+    if distance < reach:
+        score += APPROACH_SCORE
+    if distance < player_reach:
+        score -= THREAT_SCORE * (1 - distance / player_reach)
+    return score
+
+def evaluate_shots(scene, shots, deadline=None):
+    """评估一批 (角度, 力量)，返回 [(得分, 角度, 力量), ...]；在工作进程中运行
+
+    deadline 为 time.time() 的截止时间，到时停止评估并返回已有的结果，
+    超出预算后仍在运行的批次因此很快结束，不会占住进程池拖慢下一回合的搜索
+    """
+    (x, y, radius, reach), (player_x, player_y, player_reach), obstacles, power_ups = scene
+    collider = build_collider(obstacles)
+    player = (player_x, player_y)
+    results = []
+    for angle, power in shots:
+        if deadline is not None and time.time() >= deadline:
+            break
+        path = trajectory.predict_shot(x, y, angle, power, radius, collider)
+        results.append((score_shot(path, player, power_ups, reach, player_reach, radius), angle, power))
+    return results
+
+def best_of(best, results):
+    """合并一批结果，得分相同时保留先出现的"""
+    for result in results:
+        if best is None or result[0] > best[0]:
+            best = result
+    return best
+
+class ShotPlanner:
+    def __init__(self, difficulty='normal', time_budget=None, samples=None, workers=None,
+                 batch_size=32, seed=None):
+        settings = DIFFICULTY[difficulty]
+        self.difficulty = difficulty
+        self.samples = samples or settings['samples']
+        self.time_budget = settings['time_budget'] if time_budget is None else time_budget
+        self.angle_spread = settings['angle_spread']
+        self.accuracy = settings['accuracy']
+        self.workers = workers  # 0 表示在当前进程中评估，None 表示使用全部核
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.last_evaluated = 0  # 上一次搜索在预算内评估的候选数
+
+    def close(self):
+        """关闭进程池"""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sample_shots(self, ball, target):
+        """生成候选：先是正对目标的若干力量，其余为随机角度和力量"""
+        max_power = ball.max_power
+        direct = math.degrees(math.atan2(target.y - ball.y, target.x - ball.x))
+        shots = [(direct, ARROW_LENGTH_MIN + (max_power - ARROW_LENGTH_MIN) * i / 7) for i in range(8)]
+        while len(shots) < self.samples:
+            shots.append((self.rng.uniform(0, 360), self.rng.uniform(ARROW_LENGTH_MIN, max_power)))
+        return shots[:self.samples]
+
+    def search(self, game, ball=None, target=None):
+        """在时间预算内评估候选，返回得分最高的 (得分, 角度, 力量)
+
+        ball 为击球的球，target 为要击中的球，默认分别是电脑和玩家的球
+        """
+        ball = ball or game.computer_ball
+        target = target or game.player_ball
+        deadline = time.perf_counter() + self.time_budget
+        scene = capture_scene(game, ball, target)
+        shots = self.sample_shots(ball, target)
+        batches = [shots[i:i + self.batch_size] for i in range(0, len(shots), self.batch_size)]
+
+        best = None
+        evaluated = 0
+        if self.workers == 0:
+            for batch in batches:
+                results = evaluate_shots(scene, batch)
+                evaluated += len(results)
+                best = best_of(best, results)
+                if time.perf_counter() >= deadline:
+                    break
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            # 工作进程与本进程的 perf_counter 不一定可比，截止时间用 time.time() 传递
+            worker_deadline = time.time() + max(0.0, deadline - time.perf_counter())
+            futures = [self.pool.submit(evaluate_shots, scene, batch, worker_deadline) for batch in batches]
+            try:
+                for future in as_completed(futures, timeout=max(0.0, deadline - time.perf_counter())):
+                    results = future.result()
+                    evaluated += len(results)
+                    best = best_of(best, results)
+            except TimeoutError:
+                # 超出预算：取消尚未开始的批次（已开始的批次到截止时间自行结束），使用已有的最佳结果
+                for future in futures:
+                    future.cancel()
+
+        self.last_evaluated = evaluated
+        if best is None:
+            # 预算内一批也没有完成，退回正对玩家的一击
+            best = (0, shots[0][0], (ARROW_LENGTH_MIN + ball.max_power) / 2)
+        return best
+
+    def plan(self, game, ball=None, target=None):
+        """返回本回合的 (目标角度, 目标力量)，按难度加入执行误差；ball、target 的含义同 search"""
+        ball = ball or game.computer_ball
+        _, angle, power = self.search(game, ball, target)
+        angle += self.rng.uniform(-self.angle_spread, self.angle_spread)
+        variation = power * (1 - self.accuracy)
+        power += self.rng.uniform(-variation, variation)
+        power = max(ARROW_LENGTH_MIN, min(power, ball.max_power))
+        return angle, power
@@ -0,0 +1,160 @@
+# 道具的结构数组存储：位置、半径、类型、是否神秘、生成时间、寿命、是否已收集保存在 NumPy 数组中，
+# 道具较多时，拾取检测（所有球一次）、过期清理和生成时的间距检查都是一次向量化运算，可容纳成千上万个道具
+# 每个道具仍对应一个 PowerUp 对象（颜色等绘制属性），迭代存储按生成顺序返回这些对象，绘制接口不变；
+# 位置、半径、类型在生成后不再变化，已收集和寿命通过 collect / set_lifetime 修改，数组与对象保持一致
+import numpy as np
+
+# 道具数不超过该值时，拾取检测、过期清理和间距检查逐个比较道具对象（纯 Python，几乎不分配内存），
+# 比构造临时数组更快；超过时才使用向量化运算
+SCALAR_POWER_UPS = 32
+FIELDS = ('x', 'y', 'radius', 'kind', 'mystery', 'creation_time', 'lifetime', 'collected')
+
+class PowerUpStore:
+    def __init__(self, capacity=64):
+        self.items = []  # PowerUp 对象，与数组的前 len(items) 项一一对应
+        self.type_codes = {}  # 道具类型 -> 数组中的类型编号
+        self.allocate(capacity)
+        self.collected_count = 0  # 已收集、尚未清理的道具数
+        self.next_expiry = float('inf')  # 未收集道具中最早的过期时间
+
+    def allocate(self, capacity):
+        """把数组扩展到 capacity，保留已有的项"""
+        count = len(self.items)
+        arrays = {
+            'x': np.zeros(capacity),
+            'y': np.zeros(capacity),
+            'radius': np.zeros(capacity),
+            'kind': np.zeros(capacity, dtype=np.int8),
+            'mystery': np.zeros(capacity, dtype=bool),
+            'creation_time': np.zeros(capacity, dtype=np.int64),
+            'lifetime': np.zeros(capacity, dtype=np.int64),
+            'collected': np.zeros(capacity, dtype=bool),
+        }
+        for name, array in arrays.items():
+            if count:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def add(self, power_up):
+        """登记新生成的道具"""
+        i = len(self.items)
+        if i == len(self.x):
+            self.allocate(len(self.x) * 2)
+        self.items.append(power_up)
+        self.x[i] = power_up.x
+        self.y[i] = power_up.y
+        self.radius[i] = power_up.radius
+        self.kind[i] = self.type_codes.setdefault(power_up.type, len(self.type_codes))
+        self.mystery[i] = power_up.is_mystery
+        self.creation_time[i] = power_up.creation_time
+        self.lifetime[i] = power_up.lifetime
+        self.collected[i] = power_up.collected
+        self.next_expiry = min(self.next_expiry, power_up.creation_time + power_up.lifetime)
+
+    def collect(self, index):
+        """标记第 index 个道具已收集，下一次 sweep 时移除"""
+        self.items[index].collected = True
+        self.collected[index] = True
+        self.collected_count += 1
+
+    def set_lifetime(self, lifetime):
+        """修改全部道具的寿命（毫秒）"""
+        for power_up in self.items:
+            power_up.lifetime = lifetime
+        count = len(self.items)
+        self.lifetime[:count] = lifetime
+        self.update_next_expiry()
+
+    def update_next_expiry(self):
+        count = len(self.items)
+        if count <= SCALAR_POWER_UPS:
+            self.next_expiry = min((power_up.creation_time + power_up.lifetime
+                                    for power_up in self.items if not power_up.collected),
+                                   default=float('inf'))
+            return
+        live = ~self.collected[:count]
+        if live.any():
+            deadlines = self.creation_time[:count] + self.lifetime[:count]
+            self.next_expiry = int(deadlines[live].min())
+        else:
+            self.next_expiry = float('inf')
+
+    def sweep(self, now):
+        """移除已收集和已过期（now - 生成时间 >= 寿命）的道具，保持其余道具的顺序，返回移除的对象
+
+        没有已收集的道具且还没到最早的过期时间时直接返回，不做数组运算
+        """
+        if not self.collected_count and now < self.next_expiry:
+            return []
+        count = len(self.items)
+        if count <= SCALAR_POWER_UPS:
+            kept = []
+            removed = []
+            for i, power_up in enumerate(self.items):
+                if not power_up.collected and now - power_up.creation_time < power_up.lifetime:
+                    kept.append(i)
+                else:
+                    removed.append(power_up)
+            for name in FIELDS:
+                array = getattr(self, name)
+                for j, i in enumerate(kept):
+                    array[j] = array[i]
+        else:
+            keep = ~self.collected[:count] & (now - self.creation_time[:count] < self.lifetime[:count])
+            removed = [self.items[i] for i in np.flatnonzero(~keep)]
+            kept = np.flatnonzero(keep)
+            for name in FIELDS:
+                array = getattr(self, name)
+                array[:len(kept)] = array[kept]
+        self.items = [self.items[i] for i in kept]
+        self.collected_count = 0
+        self.update_next_expiry()
+        return removed
+
+    def clear(self):
+        """移除全部道具，返回移除的对象"""
+        removed = self.items
+        self.items = []
+        self.collected_count = 0
+        self.next_expiry = float('inf')
+        return removed
+
+    def candidates(self, xs, ys, reaches):
+        """每个球可能接触的未收集道具：返回形状 (球数, 道具数) 的掩码
+
+        第 b 个球位于 (xs[b], ys[b])，reaches[b] 为其可能达到的最大半径；
+        结果是候选的超集（留有少量余量），精确判断由调用方完成
+        """
+        count = len(self.items)
+        xs = np.asarray(xs, dtype=float)[:, None]
+        ys = np.asarray(ys, dtype=float)[:, None]
+        reach = np.asarray(reaches, dtype=float)[:, None] + self.radius[None, :count] + 1e-6
+        dx = xs - self.x[None, :count]
+        dy = ys - self.y[None, :count]
+        return (dx * dx + dy * dy < reach * reach) & ~self.collected[None, :count]
+
+    def any_within(self, x, y, distance):
+        """是否有未收集的道具中心与 (x, y) 的距离小于 distance"""
+        count = len(self.items)
+        if not count:
+            return False
+        if count <= SCALAR_POWER_UPS:
+            limit = distance * distance
+            for power_up in self.items:
+                dx = power_up.x - x
+                dy = power_up.y - y
+                if dx * dx + dy * dy < limit and not power_up.collected:
+                    return True
+            return False
+        dx = self.x[:count] - x
+        dy = self.y[:count] - y
+        return bool(((dx * dx + dy * dy < distance * distance) & ~self.collected[:count]).any())
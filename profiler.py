@@ -0,0 +1,136 @@
+# 分阶段帧计时：在主循环、Game.update、Game.draw 的各阶段外包一层计时，
+# 每帧各阶段的耗时存入固定大小的环形缓冲区，可统计 p50/p95/p99 并导出 JSON 以便对比不同版本
+# 关闭时 phase() 直接返回共享的空上下文，开销只有一次方法调用
+import contextlib
+import json
+import time
+
+NULL_PHASE = contextlib.nullcontext()
+
+class RingBuffer:
+    """固定容量的浮点数环形缓冲区，写满后覆盖最旧的值"""
+
+    def __init__(self, capacity):
+        self.values = [0.0] * capacity
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def samples(self):
+        """按时间先后排列的样本"""
+        if self.count < len(self.values):
+            return self.values[:self.count]
+        return self.values[self.index:] + self.values[:self.index]
+
+def percentile(sorted_values, fraction):
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+class Phase:
+    """一个阶段的计时上下文，同一帧内多次进入时耗时累加"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+class FrameProfiler:
+    """分阶段帧计时器
+
+    不自带锁：多个线程记录同一个计时器时（模拟线程记录 update 各阶段，主线程记录其余阶段），
+    调用方要用同一把锁（SimulationLoop.lock）包住其他线程的阶段以及 end_frame、summary、dump，
+    避免遍历阶段时另一线程新增阶段，或当前帧被替换时另一线程的耗时记到已结束的帧上
+    """
+
+    def __init__(self, capacity=600, enabled=False):
+        self.capacity = capacity  # 每个阶段保留的帧数
+        self.enabled = enabled
+        self.phases = {}  # 阶段名 -> Phase
+        self.history = {}  # 阶段名 -> RingBuffer（秒）
+        self.current = {}  # 当前帧各阶段的累计耗时
+        self.frames = 0
+        self.last_frame_end = None
+
+    def phase(self, name):
+        """返回阶段计时上下文：with profiler.phase('draw'): ..."""
+        if not self.enabled:
+            return NULL_PHASE
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name)
+            self.history[name] = RingBuffer(self.capacity)
+        return phase
+
+    def end_frame(self):
+        """结束一帧：记录各阶段耗时（本帧未运行的阶段记为 0）和整帧耗时"""
+        if not self.enabled:
+            self.last_frame_end = None
+            return
+        now = time.perf_counter()
+        if self.last_frame_end is not None:
+            self.current['frame'] = now - self.last_frame_end
+            if 'frame' not in self.history:
+                self.history['frame'] = RingBuffer(self.capacity)
+        self.last_frame_end = now
+
+        for name, buffer in self.history.items():
+            buffer.append(self.current.get(name, 0.0))
+        self.current = {}
+        self.frames += 1
+
+    def samples(self, name):
+        """某阶段最近各帧的耗时（秒）"""
+        buffer = self.history.get(name)
+        return buffer.samples() if buffer else []
+
+    def stats(self, name):
+        """某阶段的耗时统计（毫秒）"""
+        values = sorted(self.samples(name))
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0, 'max': 0.0}
+        return {
+            'p50': percentile(values, 0.50) * 1000,
+            'p95': percentile(values, 0.95) * 1000,
+            'p99': percentile(values, 0.99) * 1000,
+            'mean': sum(values) / len(values) * 1000,
+            'max': values[-1] * 1000,
+        }
+
+    def summary(self):
+        return {name: self.stats(name) for name in sorted(self.history)}
+
+    def dump(self, path):
+        """把统计写入 JSON 文件，返回写入的路径"""
+        data = {
+            'frames': self.frames,
+            'capacity': self.capacity,
+            'samples': min(self.frames, self.capacity),
+            'unit': 'ms',
+            'phases': self.summary(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        return path
+
+    def reset(self):
+        self.phases.clear()
+        self.history.clear()
+        self.current = {}
+        self.frames = 0
+        self.last_frame_end = None
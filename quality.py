@@ -0,0 +1,85 @@
+# 画质等级：绘制耗时超出帧预算时按优先级依次关闭或简化装饰效果，有余量时再逐级恢复
+# 装饰效果只影响外观，不影响游戏逻辑；当前等级可以通过 level / name 读取并记录
+#
+# 关闭顺序（先关闭的排在前面）：
+#   pulse          道具的脉动动画（关闭后静止的道具不再每帧重绘）
+#   arrow_gradient 方向箭头的 10 段渐变主体（关闭后为单段实线）
+#   translucent    信息面板、计时图表和结束遮罩的半透明效果（关闭后为不透明面板，结束时只在文字后画横条）
+
+QUALITY_LEVELS = [
+    ('low', frozenset()),
+    ('medium', frozenset({'translucent'})),
+    ('high', frozenset({'translucent', 'arrow_gradient'})),
+    ('full', frozenset({'translucent', 'arrow_gradient', 'pulse'})),
+]
+QUALITY_NAMES = [name for name, _ in QUALITY_LEVELS]
+
+class QualityGovernor:
+    """按绘制耗时调整画质等级
+
+    每帧调用 update(seconds)：耗时的指数平均超过帧预算的 high 倍时降低一级，低于 low 倍时升高一级；
+    每一级最近测得的耗时保留 memory 帧，测得升高一级会超出预算时不升高。
+    每次调整后等待 cooldown 帧再判断；governing 为 False 时固定在当前等级
+    """
+
+    def __init__(self, target_fps=60, level=len(QUALITY_LEVELS) - 1, high=0.8, low=0.5,
+                 smoothing=0.1, cooldown=60, memory=600):
+        self.budget = 1 / target_fps  # 每帧的时间预算（秒）
+        self.level = level
+        self.high = high
+        self.low = low
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.memory = memory
+        self.governing = True
+        self.average = None  # 当前等级下绘制耗时的指数平均（秒）
+        self.costs = {}  # 等级 -> (最近的平均耗时, 测量时的帧序号)
+        self.frame = 0
+        self.wait = cooldown
+        self.changes = 0
+
+    @property
+    def name(self):
+        return QUALITY_LEVELS[self.level][0]
+
+    def enabled(self, feature):
+        """当前等级是否开启装饰效果 feature"""
+        return feature in QUALITY_LEVELS[self.level][1]
+
+    def set_level(self, level):
+        """固定画质等级（等级序号或名字），之后不再自动调整"""
+        if isinstance(level, str):
+            level = QUALITY_NAMES.index(level)
+        self.level = level
+        self.governing = False
+
+    def update(self, seconds):
+        """记录一帧的绘制耗时，等级改变时返回 True"""
+        self.frame += 1
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += (seconds - self.average) * self.smoothing
+        if not self.governing:
+            return False
+        if self.wait > 0:
+            self.wait -= 1
+            return False
+        self.costs[self.level] = (self.average, self.frame)
+
+        level = self.level
+        if self.average > self.budget * self.high and level > 0:
+            level -= 1
+        elif self.average < self.budget * self.low and level < len(QUALITY_LEVELS) - 1:
+            measured = self.costs.get(level + 1)
+            if measured is None or self.frame - measured[1] > self.memory or measured[0] <= self.budget * self.high:
+                level += 1
+        if level == self.level:
+            return False
+        measured = self.costs.get(level)
+        if measured is not None and self.frame - measured[1] <= self.memory:
+            self.average = measured[0]
+        self.level = level
+        self.wait = self.cooldown
+        self.changes += 1
+        return True
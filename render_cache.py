@@ -0,0 +1,91 @@
+# 渲染缓存：按键缓存预渲染的 Surface，按最近最少使用（LRU）淘汰，并限制总内存
+import weakref
+from collections import OrderedDict
+
+def surface_bytes(surface):
+    """Surface 像素数据占用的字节数"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+class SurfaceCache:
+    def __init__(self, max_bytes, max_entries=None):
+        self.max_bytes = max_bytes  # 内存上限（字节）
+        self.max_entries = max_entries  # 条目数上限，None 表示不限
+        self.entries = OrderedDict()  # key -> (value, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        """返回 key 对应的缓存值；未命中时调用 build() 生成
+
+        build 返回一个 Surface，或第一个元素为 Surface 的元组
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        value = build()
+        surface = value[0] if isinstance(value, tuple) else value
+        size = surface_bytes(surface)
+        self.entries[key] = (value, size)
+        self.bytes += size
+        self._evict()
+        return value
+
+    def _evict(self):
+        # 至少保留刚加入的一项
+        while len(self.entries) > 1 and (
+                self.bytes > self.max_bytes or
+                (self.max_entries is not None and len(self.entries) > self.max_entries)):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """命中统计，用于确定缓存大小"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+class TextCache(SurfaceCache):
+    """文字渲染缓存：字符串不变时返回同一个 Surface，稳定的帧不再光栅化字形"""
+
+    def __init__(self, max_bytes, max_entries=None):
+        super().__init__(max_bytes, max_entries)
+        # id(font) -> 弱引用；字体被回收时清除它的缓存项，避免 id 复用后取到错误的文字
+        self.fonts = {}
+
+    def render(self, font, text, color, antialias=True):
+        """等价于 font.render(text, antialias, color)，结果会被缓存"""
+        font_id = id(font)
+        if font_id not in self.fonts:
+            self.fonts[font_id] = weakref.ref(
+                font, lambda _, font_id=font_id: self.forget_font(font_id))
+        key = (font_id, text, tuple(color), antialias)
+        return self.get(key, lambda: font.render(text, antialias, color))
+
+    def forget_font(self, font_id):
+        """移除某个字体的全部缓存项"""
+        self.fonts.pop(font_id, None)
+        for key in [key for key in self.entries if key[0] == font_id]:
+            self.remove(key)
@@ -0,0 +1,119 @@
+# 内部渲染分辨率：游戏逻辑始终使用世界坐标（WINDOW_WIDTH x WINDOW_HEIGHT），
+# scale < 1 时场景按比例绘制到内部分辨率的离屏 surface，再整体放大到窗口，填充像素数按 scale² 减少；
+# 动态模式按测得的绘制耗时调整 scale 以维持目标帧率，物理结果与渲染分辨率无关
+import pygame
+
+SCALE_STEP = 0.05  # scale 的量化步长，缩放后的背景、箭头和字体按 scale 缓存，步长越小缓存越多
+
+def quantize_scale(scale, min_scale=SCALE_STEP, max_scale=1.0):
+    """把 scale 量化到 SCALE_STEP 的整数倍并限制在 [min_scale, max_scale]"""
+    scale = round(scale / SCALE_STEP) * SCALE_STEP
+    return round(min(max_scale, max(min_scale, scale)), 2)
+
+def scaled(value, scale):
+    """按 scale 缩放的长度（像素），至少为 1"""
+    return max(1, int(round(value * scale)))
+
+class RenderTarget:
+    """内部分辨率的渲染目标；scale 为 1 时直接绘制到窗口，不分配离屏 surface"""
+
+    def __init__(self, world_size, scale=1.0, smooth=True):
+        self.world_size = world_size
+        self.smooth = smooth  # 放大时是否使用双线性插值（否则为最近邻，更快但有锯齿）
+        self.scale = None
+        self.surface = None
+        self.set_scale(scale)
+
+    @property
+    def native(self):
+        return self.scale == 1.0
+
+    @property
+    def size(self):
+        """内部分辨率"""
+        return scaled(self.world_size[0], self.scale), scaled(self.world_size[1], self.scale)
+
+    def set_scale(self, scale):
+        """修改内部分辨率，返回是否发生变化"""
+        scale = quantize_scale(scale)
+        if scale == self.scale:
+            return False
+        self.scale = scale
+        self.surface = None
+        if not self.native:
+            self.surface = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                self.surface = self.surface.convert()
+        return True
+
+    def present(self, screen):
+        """把离屏 surface 放大到窗口"""
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, screen.get_size(), screen)
+        else:
+            pygame.transform.scale(self.surface, screen.get_size(), screen)
+
+class AdaptiveResolution:
+    """按绘制耗时调整渲染目标的 scale
+
+    每帧调用 update(seconds)：耗时的指数平均超过帧预算的 high 倍时降低一级，
+    升高一级后的耗时预计低于帧预算的 low 倍时升高一级。每一级最近测得的耗时保留 memory 帧，
+    没有测量值时按像素数估计（耗时 ∝ scale²）；放大到窗口本身也有开销（纯软件渲染时尤其明显），
+    测得降低分辨率并不更快时会回到更快的一级。每次调整后等待 cooldown 帧再判断，避免在两级之间来回切换
+    """
+
+    def __init__(self, target, target_fps=60, min_scale=0.5, max_scale=1.0, step=0.1,
+                 high=0.8, low=0.6, smoothing=0.1, cooldown=30, memory=600):
+        self.target = target
+        self.budget = 1 / target_fps  # 每帧的时间预算（秒）
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.step = step
+        self.high = high
+        self.low = low
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.memory = memory
+        self.average = None  # 当前 scale 下绘制耗时的指数平均（秒）
+        self.costs = {}  # scale -> (最近的平均耗时, 测量时的帧序号)
+        self.frame = 0
+        self.wait = cooldown
+        self.changes = 0
+
+    def cost(self, scale):
+        """scale 下预计的绘制耗时：有未过期的测量值时用测量值，否则按像素数估计"""
+        measured = self.costs.get(scale)
+        if measured is not None and self.frame - measured[1] <= self.memory:
+            return measured[0]
+        return self.average * (scale / self.target.scale) ** 2
+
+    def update(self, seconds):
+        """记录一帧的绘制耗时，scale 改变时返回 True"""
+        self.frame += 1
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += (seconds - self.average) * self.smoothing
+        scale = self.target.scale
+        if self.wait > 0:
+            self.wait -= 1
+            return False
+        self.costs[scale] = (self.average, self.frame)
+
+        new_scale = scale
+        lower = quantize_scale(scale - self.step, self.min_scale, self.max_scale)
+        higher = quantize_scale(scale + self.step, self.min_scale, self.max_scale)
+        if self.average > self.budget * self.high:
+            # 超出预算：换到预计更快的相邻一级（高一级只有在测得更快时才会被选中）
+            best = min((lower, higher), key=self.cost)
+            if self.cost(best) < self.average:
+                new_scale = best
+        elif self.cost(higher) < self.budget * self.low:
+            new_scale = higher
+        if new_scale == scale:
+            return False
+        self.average = self.cost(new_scale)
+        self.target.set_scale(new_scale)
+        self.wait = self.cooldown
+        self.changes += 1
+        return True
@@ -0,0 +1,170 @@
+# 对局录制与回放：模拟只依赖随机种子（Game.rng）、固定步长时钟和每一步的空格键输入，
+# 录制这三者即可逐位复现一局；回放既可以无界面全速运行，也可以交给 Pencil 按任意速度绘制
+#
+#   python replay.py match.json                      无界面全速回放并校验结果
+#   python replay.py match.json --profile out.json   回放时记录分阶段计时
+#   python replay.py match.json --events out.jsonl   把游戏事件写入 JSON Lines 文件
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+
+import simulation
+from game_clock import GameClock, TICK_RATE
+from profiler import FrameProfiler
+from events import EventBus, ConsoleSink, AsyncFileSink, LEVELS, DEBUG
+
+FORMAT_VERSION = 1
+
+def state_digest(game):
+    """对局状态的摘要，回放结束时与录制时比较"""
+    state = [game.clock.frame, game.current_turn, game.computer_state, game.game_over, game.winner]
+    for ball in (game.player_ball, game.computer_ball):
+        state.append((ball.x, ball.y, ball.dx, ball.dy, ball.radius, ball.angle, ball.power,
+                      ball.is_moving, ball.is_aiming, ball.is_power_adjusting))
+    for power_up in game.power_ups:
+        state.append((power_up.x, power_up.y, power_up.type.name, power_up.is_mystery, power_up.collected))
+    for obstacle in game.obstacles:
+        state.append(tuple(obstacle.rect))
+    return hashlib.sha256(repr(state).encode()).hexdigest()
+
+class Recording:
+    def __init__(self, seed, tick_rate=TICK_RATE, swept_collisions=True, inputs=None, frames=0, digest=None):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.swept_collisions = swept_collisions
+        self.inputs = inputs if inputs is not None else []  # 按下空格键时的步数（按下后才推进该步）
+        self.frames = frames  # 录制的总步数
+        self.digest = digest  # 结束时的状态摘要
+
+    def to_dict(self):
+        return {
+            'version': FORMAT_VERSION,
+            'seed': self.seed,
+            'tick_rate': self.tick_rate,
+            'swept_collisions': self.swept_collisions,
+            'frames': self.frames,
+            'digest': self.digest,
+            'inputs': self.inputs,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"不支持的录像版本: {data.get('version')}")
+        return cls(data['seed'], data['tick_rate'], data['swept_collisions'],
+                   data['inputs'], data['frames'], data['digest'])
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+def new_game(recording, game_class=simulation.Game, **kwargs):
+    """按录像的种子和设置创建对局；kwargs 传给 game_class（例如 Pencil.Game 的绘制参数）"""
+    return game_class(clock=GameClock(recording.tick_rate), swept_collisions=recording.swept_collisions,
+                      rng=random.Random(recording.seed), **kwargs)
+
+class Recorder:
+    """录制一局：用 create_game 创建对局，用 press_space 代替 game.press_space"""
+
+    def __init__(self, seed=None, tick_rate=TICK_RATE, swept_collisions=True):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.recording = Recording(seed, tick_rate, swept_collisions)
+        self.game = None
+
+    def create_game(self, game_class=simulation.Game, **kwargs):
+        self.game = new_game(self.recording, game_class, **kwargs)
+        return self.game
+
+    def press_space(self):
+        self.recording.inputs.append(self.game.clock.frame)
+        self.game.press_space()
+
+    def finish(self):
+        """结束录制，返回录像"""
+        self.recording.frames = self.game.clock.frame
+        self.recording.digest = state_digest(self.game)
+        return self.recording
+
+class Replayer:
+    """按录像逐步推进对局"""
+
+    def __init__(self, recording, game):
+        self.recording = recording
+        self.game = game
+        self.next_input = 0
+
+    @property
+    def finished(self):
+        return self.game.clock.frame >= self.recording.frames
+
+    def step(self):
+        """施加本步的输入并推进一步"""
+        inputs = self.recording.inputs
+        while self.next_input < len(inputs) and inputs[self.next_input] <= self.game.clock.frame:
+            self.game.press_space()
+            self.next_input += 1
+        self.game.update()
+
+def replay(recording, game_class=simulation.Game, on_frame=None, **kwargs):
+    """无界面全速回放，返回回放结束时的对局；on_frame(game) 在每步之后调用"""
+    game = new_game(recording, game_class, **kwargs)
+    replayer = Replayer(recording, game)
+    while not replayer.finished:
+        replayer.step()
+        if on_frame is not None:
+            on_frame(game)
+    return game
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面回放录像")
+    parser.add_argument('recording', help="录像文件")
+    parser.add_argument('--profile', metavar='PATH', help="记录分阶段计时并导出到 JSON")
+    parser.add_argument('--verbose', action='store_true', help="打印全部游戏事件")
+    parser.add_argument('--events', metavar='PATH', help="把游戏事件按 JSON Lines 写入 PATH")
+    parser.add_argument('--log-level', choices=list(LEVELS), default='debug', help="写入文件的最低事件级别")
+    args = parser.parse_args(argv)
+
+    recording = Recording.load(args.recording)
+    profiler = None
+    if args.profile:
+        profiler = FrameProfiler(capacity=max(recording.frames, 1), enabled=True)
+
+    def on_frame(game):
+        if profiler is not None:
+            profiler.end_frame()
+
+    events = EventBus()
+    if args.verbose:
+        events.add_sink(ConsoleSink(), DEBUG)
+    event_file = None
+    if args.events:
+        event_file = events.add_sink(AsyncFileSink(args.events), LEVELS[args.log_level])
+
+    start = time.perf_counter()
+    game = replay(recording, on_frame=on_frame, profiler=profiler, events=events)
+    elapsed = time.perf_counter() - start
+    if event_file is not None:
+        event_file.close()
+
+    print(f"回放 {recording.frames} 步，用时 {elapsed:.3f} 秒（{recording.frames / max(elapsed, 1e-9):.0f} 步/秒）")
+    if profiler is not None:
+        print(f"计时数据已导出: {profiler.dump(args.profile)}")
+    if recording.digest is None:
+        return 0
+    if state_digest(game) == recording.digest:
+        print("结果一致")
+        return 0
+    print("结果不一致")
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,821 @@
+# 无界面模拟核心：保存游戏状态与逐帧推进逻辑，不依赖 pygame 显示
+# 可在工作进程中批量运行对局（AI 调参、回归测试），Pencil.py 在此基础上负责绘制
+import math
+import random
+from enum import Enum
+
+import numpy as np
+
+from game_clock import GameClock
+from spatial import UniformGrid
+from power_up_store import PowerUpStore, SCALAR_POWER_UPS
+from collision import SweptCollider
+from line_of_sight import LineOfSight
+from profiler import FrameProfiler
+from events import DEBUG, INFO, bus as event_bus
+
+# 世界尺寸（与窗口尺寸一致）
+WINDOW_WIDTH = 1920
+WINDOW_HEIGHT = 1080
+
+# 颜色定义
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+GREEN = (0, 255, 0)
+GRAY = (128, 128, 128)
+
+# 球的属性
+BALL_RADIUS = 25
+ARROW_LENGTH_MIN = 30
+ARROW_LENGTH_MAX = 100
+POWER_CHANGE_SPEED = 2
+FRICTION = 0.98
+ROTATION_SPEED = 3
+
+# 定义道具类型
+class PowerUpType(Enum):
+    SPEED_UP = "加快旋转"     # 坏球 - 红色
+    SPEED_DOWN = "减慢旋转"   # 好球 - 绿色
+    POWER_UP = "增加强度"     # 好球 - 绿色
+    POWER_DOWN = "减小强度"   # 坏球 - 红色
+    SIZE_UP = "增大球体"      # 坏球 - 红色
+    SIZE_DOWN = "缩小球体"    # 好球 - 绿色
+    RESET_POSITION = "回到起点" # 中性 - 黑色
+    RANDOM = "随机效果"       # 神秘 - 白色带黑边
+
+# 持续效果的种类（随机效果会先转化为其他效果），球的效果数组按 EFFECT_INDEX 下标存放
+EFFECT_TYPES = tuple(effect_type for effect_type in PowerUpType if effect_type != PowerUpType.RANDOM)
+EFFECT_INDEX = {effect_type: i for i, effect_type in enumerate(EFFECT_TYPES)}
+# 持续效果修改的属性及倍数：属性取基础值乘以最近获得的同一属性效果的倍数，
+# 该属性的任一效果结束时恢复为基础值
+EFFECT_MODIFIERS = {
+    PowerUpType.SPEED_UP: ('rotation_speed', 2.0),
+    PowerUpType.SPEED_DOWN: ('rotation_speed', 0.5),
+    PowerUpType.POWER_UP: ('max_power', 1.5),
+    PowerUpType.POWER_DOWN: ('max_power', 0.7),
+    PowerUpType.SIZE_UP: ('radius', 2.0),
+    PowerUpType.SIZE_DOWN: ('radius', 0.5),
+}
+EFFECT_BASE_STATS = {'rotation_speed': 'base_rotation_speed', 'max_power': 'base_power_max', 'radius': 'base_radius'}
+
+class Rect:
+    """与 pygame.Rect 行为一致的整数矩形（坐标向零取整）"""
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, x, y, width, height):
+        self.x = int(x)
+        self.y = int(y)
+        self.width = int(width)
+        self.height = int(height)
+
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @property
+    def center(self):
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+    def colliderect(self, other):
+        """两矩形是否重叠（空矩形不与任何矩形重叠）"""
+        if self.width <= 0 or self.height <= 0 or other.width <= 0 or other.height <= 0:
+            return False
+        return (self.x < other.x + other.width and other.x < self.x + self.width and
+                self.y < other.y + other.height and other.y < self.y + self.height)
+
+    def collidepoint(self, x, y):
+        """点是否在矩形内（右、下边界不包含）"""
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    # 支持按序列访问，可直接传给 pygame.draw 等接口
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.width, self.height)[index]
+
+    def __repr__(self):
+        return f"Rect({self.x}, {self.y}, {self.width}, {self.height})"
+
+def obstacle_bounds(obstacle):
+    """障碍物在空间索引中的包围盒"""
+    rect = obstacle.rect
+    return rect.left, rect.top, rect.right, rect.bottom
+
+class Obstacle:
+    __slots__ = ('rect', 'color')
+
+    def __init__(self, x, y, width, height):
+        self.rect = Rect(x, y, width, height)
+        self.color = (100, 100, 100)  # 障碍物颜色
+
+class PowerUp:
+    __slots__ = ('x', 'y', 'type', 'is_mystery', 'radius', 'color', 'outline_color',
+                 'lifetime', 'collected', 'clock', 'creation_time')
+
+    def __init__(self, x, y, clock, rng=None):
+        self.spawn(x, y, clock, rng)
+
+    def spawn(self, x, y, clock, rng=None):
+        """初始化为新生成的道具；道具池复用对象时再次调用"""
+        rng = rng or random  # 随机数来源，默认使用全局 random 模块
+        self.x = x
+        self.y = y
+        self.type = rng.choice(list(PowerUpType))  # 随机选择任意效果
+        self.is_mystery = rng.random() < 0.3  # 30%概率是问号球
+
+        # 设置基础属性
+        self.radius = 15
+        self.color = (255, 255, 255)
+        self.outline_color = (0, 0, 0)
+        self.lifetime = 45000
+        self.collected = False
+        self.clock = clock
+        self.creation_time = clock.get_ticks()
+
+        # 根据效果类型设置特定属性
+        if self.is_mystery:
+            # 问号球：白色带黑边
+            self.color = (255, 255, 255)
+            self.outline_color = (0, 0, 0)
+            self.radius = rng.randint(15, 20)
+            self.lifetime = rng.randint(40000, 50000)
+        else:
+            if self.type in [PowerUpType.SPEED_UP, PowerUpType.POWER_DOWN, PowerUpType.SIZE_UP]:
+                # 负面效果：红色，大球
+                self.color = (255, 80, 80)
+                self.outline_color = (255, 80, 80)
+                self.radius = rng.randint(20, 25)
+                self.lifetime = rng.randint(50000, 60000)
+            elif self.type in [PowerUpType.SPEED_DOWN, PowerUpType.POWER_UP, PowerUpType.SIZE_DOWN]:
+                # 正面效果：绿色，小球
+                self.color = (80, 255, 80)
+                self.outline_color = (80, 255, 80)
+                self.radius = rng.randint(12, 15)
+                self.lifetime = rng.randint(30000, 40000)
+            elif self.type == PowerUpType.RESET_POSITION:
+                # 重置位置：黑色，中等大小
+                self.color = (50, 50, 50)
+                self.outline_color = (50, 50, 50)
+                self.radius = rng.randint(15, 18)
+                self.lifetime = rng.randint(40000, 50000)
+
+class AI:
+    def __init__(self, rng=None):
+        self.rng = rng or random  # 随机数来源，默认使用全局 random 模块
+        self.difficulty = "normal"  # easy, normal, hard
+        self.accuracy = 0.8  # 命中率基准
+        self.min_power = ARROW_LENGTH_MIN
+        self.max_power = ARROW_LENGTH_MAX
+
+    def calculate_shot(self, computer_ball, player_ball):
+        """计算最佳射击角度和力量"""
+        dx = player_ball.x - computer_ball.x
+        dy = player_ball.y - computer_ball.y
+        distance = math.sqrt(dx*dx + dy*dy)
+
+        # 基础角度计算
+        base_angle = math.degrees(math.atan2(dy, dx))
+
+        # 根据难度添加随机偏移
+        if self.difficulty == "easy":
+            angle_offset = self.rng.uniform(-20, 20)
+            self.accuracy = 0.6
+        elif self.difficulty == "normal":
+            angle_offset = self.rng.uniform(-10, 10)
+            self.accuracy = 0.8
+        else:  # hard
+            angle_offset = self.rng.uniform(-5, 5)
+            self.accuracy = 0.95
+
+        # 计算最终角度
+        final_angle = base_angle + angle_offset
+
+        # 计算力量
+        ideal_power = min(distance / 5, self.max_power)
+        power_variation = ideal_power * (1 - self.accuracy)
+        final_power = ideal_power + self.rng.uniform(-power_variation, power_variation)
+        final_power = max(self.min_power, min(final_power, self.max_power))
+
+        return final_angle, final_power
+
+    def predict_collision(self, ball1_pos, ball2_pos, velocity, angle, collider=None):
+        """预测是否会发生碰撞
+
+        velocity 为初速度（与 Ball.shoot 相同，即力量 / 10），沿闭式轨迹（含反弹）检查
+        是否经过目标附近；collider 为 None 时只考虑窗口边界。
+        velocity 不是位移距离：球在摩擦作用下约滑行 velocity / (1 - FRICTION) 后停止，
+        检查的是整条轨迹而不只是一个终点
+        """
+        import trajectory
+
+        dx = math.cos(math.radians(angle)) * velocity
+        dy = math.sin(math.radians(angle)) * velocity
+        path = trajectory.predict(ball1_pos[0], ball1_pos[1], dx, dy, BALL_RADIUS, collider)
+        return path.closest_approach(ball2_pos[0], ball2_pos[1]) < BALL_RADIUS * 2
+
+class Ball:
+    __slots__ = ('original_x', 'original_y', 'x', 'y', 'color', 'clock', 'rng', 'dx', 'dy',
+                 'angle', 'power', 'base_power_max', 'max_power', 'base_radius', 'radius',
+                 'is_aiming', 'is_power_adjusting', 'is_moving', 'power_increasing', 'turn_complete',
+                 'base_rotation_speed', 'rotation_speed', 'effect_end', 'effect_timers', 'events', 'side')
+
+    def __init__(self, x, y, color, clock, rng=None, events=None, side=None):
+        self.original_x = x
+        self.original_y = y
+        self.x = x
+        self.y = y
+        self.color = color
+        self.clock = clock
+        self.rng = rng or random  # 随机数来源，默认使用全局 random 模块
+        self.events = events or event_bus  # 事件总线，默认为 events.bus
+        self.side = side  # 'player' / 'computer'，记录在事件中
+        self.dx = 0
+        self.dy = 0
+        self.angle = 0
+        self.power = ARROW_LENGTH_MIN
+        self.base_power_max = ARROW_LENGTH_MAX
+        self.max_power = self.base_power_max
+        self.base_radius = BALL_RADIUS
+        self.radius = self.base_radius
+        self.is_aiming = False
+        self.is_power_adjusting = False
+        self.is_moving = False
+        self.power_increasing = True
+        self.turn_complete = False
+        self.base_rotation_speed = ROTATION_SPEED
+        self.rotation_speed = self.base_rotation_speed
+
+        # 效果状态跟踪：按 EFFECT_INDEX 存放各效果的结束时间（None 表示未生效）和到期定时器
+        self.effect_end = [None] * len(EFFECT_TYPES)
+        self.effect_timers = [None] * len(EFFECT_TYPES)
+
+    def active_effects(self):
+        """生效中的效果 [(效果类型, 结束时间), ...]，按 EFFECT_TYPES 的顺序"""
+        return [(EFFECT_TYPES[i], end_time) for i, end_time in enumerate(self.effect_end)
+                if end_time is not None]
+
+    def set_stat(self, stat, factor=None):
+        """把属性 stat 设为基础值乘以 factor，factor 为 None 时恢复为基础值"""
+        value = getattr(self, EFFECT_BASE_STATS[stat])
+        setattr(self, stat, value if factor is None else value * factor)
+
+    def expire_effect(self, index):
+        """效果到期（由时钟的定时器队列调用）"""
+        self.effect_end[index] = None
+        self.effect_timers[index] = None
+        self.set_stat(EFFECT_MODIFIERS[EFFECT_TYPES[index]][0])
+        if self.events.min_level <= INFO:
+            self.events.emit(INFO, 'effect_expired', self.clock.get_ticks(), side=self.side,
+                             effect=EFFECT_TYPES[index].name, rotation_speed=self.rotation_speed,
+                             max_power=self.max_power, radius=self.radius)
+
+    def clear_effects(self):
+        """取消全部效果及其定时器"""
+        for timer in self.effect_timers:
+            if timer is not None:
+                timer.cancel()
+        self.effect_end = [None] * len(EFFECT_TYPES)
+        self.effect_timers = [None] * len(EFFECT_TYPES)
+        for stat in EFFECT_BASE_STATS:
+            self.set_stat(stat)
+
+    def shoot(self):
+        """发射球"""
+        # 根据角度和力量设置速度
+        self.dx = math.cos(math.radians(self.angle)) * (self.power / 10)
+        self.dy = math.sin(math.radians(self.angle)) * (self.power / 10)
+        self.is_moving = True
+        self.is_aiming = False
+        self.is_power_adjusting = False
+        if self.events.min_level <= INFO:
+            self.events.emit(INFO, 'shot', self.clock.get_ticks(), side=self.side, x=self.x, y=self.y,
+                             dx=self.dx, dy=self.dy, angle=self.angle, power=self.power)
+        self.power = ARROW_LENGTH_MIN  # 重置力量
+
+    def update(self, collider=None):
+        """更新球的状态
+
+        collider 为 collision.SweptCollider 时使用连续碰撞检测移动（同时处理边界和障碍物），
+        为 None 时按原先的离散方式移动，障碍物反弹由 Game.check_obstacle_collisions 处理
+        """
+        # 更新移动状态
+        if self.is_moving:
+            if collider is None:
+                self.x += self.dx
+                self.y += self.dy
+            else:
+                self.x, self.y, self.dx, self.dy = collider.move(
+                    self.x, self.y, self.dx, self.dy, self.radius)
+            self.dx *= FRICTION
+            self.dy *= FRICTION
+
+            if abs(self.dx) < 0.1 and abs(self.dy) < 0.1:
+                self.dx = 0
+                self.dy = 0
+                self.is_moving = False
+                self.turn_complete = True
+
+            if collider is None:
+                # 边界碰撞检测
+                if self.x - self.radius <= 0 or self.x + self.radius >= WINDOW_WIDTH:
+                    self.dx *= -1
+                if self.y - self.radius <= 0 or self.y + self.radius >= WINDOW_HEIGHT:
+                    self.dy *= -1
+
+                self.x = max(self.radius, min(self.x, WINDOW_WIDTH - self.radius))
+                self.y = max(self.radius, min(self.y, WINDOW_HEIGHT - self.radius))
+
+    def reset_position(self):
+        """重置到初始位置"""
+        self.x = self.original_x
+        self.y = self.original_y
+        self.dx = 0
+        self.dy = 0
+        self.is_moving = False
+        self.is_aiming = False
+        self.is_power_adjusting = False
+        self.power = ARROW_LENGTH_MIN
+        self.angle = 0
+        if self.events.min_level <= DEBUG:
+            self.events.emit(DEBUG, 'position_reset', self.clock.get_ticks(), side=self.side, x=self.x, y=self.y)
+
+    def apply_effect(self, effect_type, duration=None):
+        """应用道具效果；duration 为持续时间（毫秒），默认随机 30-60 秒"""
+        current_time = self.clock.get_ticks()
+        if duration is None:
+            duration = self.rng.randint(30000, 60000)
+
+        # 处理随机效果
+        if effect_type == PowerUpType.RANDOM:
+            available_effects = [e for e in PowerUpType if e != PowerUpType.RANDOM]
+            effect_type = self.rng.choice(available_effects)
+            if self.events.min_level <= DEBUG:
+                self.events.emit(DEBUG, 'effect_randomized', current_time, side=self.side, effect=effect_type.name)
+
+        # 重置位置是即时效果
+        if effect_type == PowerUpType.RESET_POSITION:
+            self.reset_position()
+            self.turn_complete = True  # 标记回合结束
+            return
+
+        # 设置效果持续时间，重复获得同一效果时重新计时
+        index = EFFECT_INDEX[effect_type]
+        if self.effect_timers[index] is not None:
+            self.effect_timers[index].cancel()
+        self.effect_end[index] = current_time + duration
+        self.effect_timers[index] = self.clock.timers.schedule(
+            self.effect_end[index], self.expire_effect, index)
+
+        # 应用效果
+        self.set_stat(*EFFECT_MODIFIERS[effect_type])
+
+        if self.events.min_level <= INFO:
+            self.events.emit(INFO, 'effect_applied', current_time, side=self.side, effect=effect_type.name,
+                             duration=duration, rotation_speed=self.rotation_speed,
+                             max_power=self.max_power, radius=self.radius)
+
+class Game:
+    # 实体类型，渲染层可替换为带绘制方法的子类
+    ball_class = Ball
+    power_up_class = PowerUp
+    obstacle_class = Obstacle
+
+    def __init__(self, clock=None, swept_collisions=True, planner=None, profiler=None, rng=None,
+                 obstacle_count=None, powerup_interval=(5000, 10000), events=None):
+        # 初始化基本属性
+        self.clock = clock or GameClock()  # 所有子系统共用的模拟时钟
+        # 所有随机决策共用的随机数来源；传入 random.Random(seed) 可完整复现一局
+        self.rng = rng or random
+        self.obstacles = []  # 添加障碍物列表
+        # 道具的结构数组存储，迭代时按生成顺序返回 PowerUp 对象
+        self.power_ups = PowerUpStore()
+        # 障碍物的空间索引，在生成时登记
+        self.obstacle_index = UniformGrid()
+        # 连续碰撞检测；为 False 时使用原先的离散检测（与 batch_physics 一致）
+        self.collider = SweptCollider(self.obstacle_index, WINDOW_WIDTH, WINDOW_HEIGHT) if swept_collisions else None
+        # 分阶段计时（默认关闭）
+        self.profiler = profiler or FrameProfiler()
+        # 游戏事件的总线（默认为 events.bus，没有接收器时不输出任何内容）
+        self.events = events or event_bus
+        # 视线检测，障碍物布局变化时重新载入
+        self.line_of_sight = LineOfSight()
+        # 电脑的击球搜索（planner.ShotPlanner）；为 None 时使用下面的直线瞄准逻辑
+        self.planner = planner
+        # 对局设置：障碍物数量（None 表示每局随机 5-10 个）、道具生成间隔的范围（毫秒）
+        self.obstacle_count = obstacle_count
+        self.powerup_interval_range = powerup_interval
+        self.last_powerup_time = self.clock.get_ticks()
+        self.powerup_interval = self.rng.randint(*self.powerup_interval_range)
+        self.max_power_ups = 10
+        # 已收集或过期的道具对象，生成新道具时复用而不是重新分配
+        self.power_up_pool = []
+        self.player_ball = None
+        self.computer_ball = None
+
+        # 创建AI
+        self.ai = AI(self.rng)
+
+        # 重置游戏状态
+        self.reset_game()
+
+    def reset_game(self):
+        """重置游戏状态"""
+        # 取消上一局的效果定时器
+        for ball in (self.player_ball, self.computer_ball):
+            if ball is not None:
+                ball.clear_effects()
+
+        # 创建玩家和电脑的球
+        self.player_ball = self.ball_class(WINDOW_WIDTH * 0.2, WINDOW_HEIGHT/2, BLUE, self.clock, self.rng,
+                                           events=self.events, side='player')
+        self.computer_ball = self.ball_class(WINDOW_WIDTH * 0.8, WINDOW_HEIGHT/2, RED, self.clock, self.rng,
+                                             events=self.events, side='computer')
+
+        # 重置游戏状态
+        self.game_over = False
+        self.winner = None
+        self.current_turn = "player"
+        self.computer_state = "waiting"
+        self.computer_aiming_time = 0
+
+        # 清空并重新生成道具和障碍物
+        self.clear_power_ups()
+        self.obstacles.clear()
+        self.obstacle_index.clear()
+        self.line_of_sight.invalidate()
+        self.last_powerup_time = self.clock.get_ticks()
+        self.generate_obstacles()
+
+    def generate_obstacles(self):
+        """生成障碍物"""
+        # 定义安全区域（不生成障碍物的区域）
+        safe_zones = [
+            Rect(0, WINDOW_HEIGHT/2 - 100, WINDOW_WIDTH * 0.3, 200),  # 左侧安全区
+            Rect(WINDOW_WIDTH * 0.7, WINDOW_HEIGHT/2 - 100, WINDOW_WIDTH * 0.3, 200)  # 右侧安全区
+        ]
+
+        # 生成随机数量的障碍物
+        num_obstacles = self.obstacle_count
+        if num_obstacles is None:
+            num_obstacles = self.rng.randint(5, 10)
+        for _ in range(num_obstacles):
+            attempts = 0
+            max_attempts = 50  # 最大尝试次数
+
+            while attempts < max_attempts:
+                width = self.rng.randint(30, 80)
+                height = self.rng.randint(30, 80)
+                x = self.rng.randint(0, WINDOW_WIDTH - width)
+                y = self.rng.randint(0, WINDOW_HEIGHT - height)
+                new_obstacle = Rect(x, y, width, height)
+
+                # 检查是否与安全区域重叠
+                if not any(new_obstacle.colliderect(zone) for zone in safe_zones):
+                    # 检查是否与其他障碍物重叠
+                    nearby = self.obstacle_index.query_aabb(
+                        new_obstacle.left, new_obstacle.top, new_obstacle.right, new_obstacle.bottom)
+                    if not any(new_obstacle.colliderect(obs.rect) for obs in nearby):
+                        obstacle = self.obstacle_class(x, y, width, height)
+                        self.obstacles.append(obstacle)
+                        self.obstacle_index.insert(obstacle, *obstacle_bounds(obstacle))
+                        break
+
+                attempts += 1
+
+        self.line_of_sight.set_obstacles(self.obstacles)
+
+    def generate_power_up(self):
+        current_time = self.clock.get_ticks()
+
+        # 清理已收集或过期的道具（没有时不做任何数组运算）
+        self.power_up_pool.extend(self.power_ups.sweep(current_time))
+
+        # 如果当前道具数量小于最大值，且达到生成间隔，尝试生成新道具
+        if (len(self.power_ups) < self.max_power_ups and
+            current_time - self.last_powerup_time >= self.powerup_interval):
+
+            # 随机决定是否生成新道具（50%概率）
+            if self.rng.random() < 0.5:
+                self.try_generate_new_powerup(current_time)
+
+            # 无论是否生成成功，都更新最后生成时间和下一个检查间隔
+            self.last_powerup_time = current_time
+            self.powerup_interval = self.rng.randint(*self.powerup_interval_range)
+
+    def new_power_up(self, x, y):
+        """在 (x, y) 生成道具，优先复用道具池中的对象"""
+        if self.power_up_pool:
+            power_up = self.power_up_pool.pop()
+            power_up.spawn(x, y, self.clock, self.rng)
+            return power_up
+        return self.power_up_class(x, y, self.clock, self.rng)
+
+    def clear_power_ups(self):
+        """移除全部道具"""
+        self.power_up_pool.extend(self.power_ups.clear())
+
+    def try_generate_new_powerup(self, current_time):
+        """尝试在合适的位置生成新道具"""
+        attempts = 0
+        max_attempts = 10  # 最大尝试次数
+
+        while attempts < max_attempts:
+            x = self.rng.randint(50, WINDOW_WIDTH - 50)
+            y = self.rng.randint(50, WINDOW_HEIGHT - 50)
+
+            # 创建检测区域（比实际道具大一些）
+            check_radius = 30
+
+            # 检查是否与障碍物重叠
+            valid_position = True
+            for obstacle in self.obstacle_index.query_aabb(x, y, x, y):
+                if obstacle.rect.collidepoint(x, y):
+                    valid_position = False
+                    break
+
+            # 检查是否与其他道具太近
+            if valid_position and self.power_ups.any_within(x, y, check_radius * 2):
+                valid_position = False
+
+            # 检查是否在玩家或电脑球的范围内
+            if valid_position:
+                for ball in [self.player_ball, self.computer_ball]:
+                    if math.hypot(x - ball.x, y - ball.y) < check_radius + ball.radius:
+                        valid_position = False
+                        break
+
+            if valid_position:
+                self.power_ups.add(self.new_power_up(x, y))
+                return True
+
+            attempts += 1
+
+        return False
+
+    def check_power_up_collisions(self, balls):
+        """检查球与道具的碰撞并应用效果，balls 按顺序处理"""
+        count = len(self.power_ups)
+        if not count:
+            return
+        if count <= SCALAR_POWER_UPS:
+            # 道具不多时逐个比较，比构造数组更快且不分配内存
+            for ball in balls:
+                for index, power_up in enumerate(self.power_ups):
+                    self.check_power_up_collision(ball, index, power_up)
+            return
+        # 拾取过程中球可能变大，按可能的最大半径一次算出所有球的候选，再逐个精确判断
+        reaches = [max(ball.radius, ball.base_radius * 2) for ball in balls]
+        candidates = self.power_ups.candidates(
+            [ball.x for ball in balls], [ball.y for ball in balls], reaches)
+        for ball, reach, row in zip(balls, reaches, candidates):
+            indices = np.flatnonzero(row)
+            i = 0
+            while i < len(indices):
+                index = indices[i]
+                position = (ball.x, ball.y)
+                self.check_power_up_collision(ball, index, self.power_ups[index])
+                if (ball.x, ball.y) != position:
+                    # 拾取使球回到了起点，其余道具按新位置重新计算候选，与逐个比较的顺序和结果一致
+                    row = self.power_ups.candidates([ball.x], [ball.y], [reach])[0]
+                    indices = index + 1 + np.flatnonzero(row[index + 1:])
+                    i = 0
+                else:
+                    i += 1
+
+    def check_power_up_collision(self, ball, index, power_up):
+        """球接触第 index 个未收集的道具时收集它"""
+        if not power_up.collected:
+            distance = math.hypot(ball.x - power_up.x, ball.y - power_up.y)
+            if distance < ball.radius + power_up.radius:
+                self.pick_up_power_up(ball, index)
+
+    def pick_up_power_up(self, ball, index):
+        """球收集第 index 个道具"""
+        power_up = self.power_ups[index]
+        effect_type = power_up.type
+        if power_up.is_mystery:
+            effect_type = PowerUpType.RANDOM
+        if self.events.min_level <= INFO:
+            self.events.emit(INFO, 'power_up_collected', self.clock.get_ticks(), side=ball.side,
+                             type=power_up.type.name, mystery=power_up.is_mystery, x=power_up.x, y=power_up.y)
+        ball.apply_effect(effect_type)
+        self.power_ups.collect(index)
+
+        # 如果是重置位置效果，特殊处理回合
+        if effect_type == PowerUpType.RESET_POSITION:
+            if self.current_turn == "player":
+                self.current_turn = "computer"
+                self.computer_state = "waiting"
+                self.player_ball.turn_complete = True
+                self.computer_ball.turn_complete = False
+            else:
+                self.current_turn = "player"
+                self.computer_ball.turn_complete = True
+                self.player_ball.turn_complete = False
+            self.emit_turn_changed('reset_position')
+
+    def emit_turn_changed(self, reason):
+        """发布回合切换事件，current_turn 为切换后的一方"""
+        if self.events.min_level <= INFO:
+            self.events.emit(INFO, 'turn_changed', self.clock.get_ticks(), turn=self.current_turn, reason=reason)
+
+    def check_collision(self):
+        dx = self.player_ball.x - self.computer_ball.x
+        dy = self.player_ball.y - self.computer_ball.y
+        distance = math.sqrt(dx*dx + dy*dy)
+
+        if distance < BALL_RADIUS * 2:
+            was_over = self.game_over
+            if self.player_ball.is_moving:
+                self.winner = "玩家"
+            elif self.computer_ball.is_moving:
+                self.winner = "电脑"
+            self.game_over = True
+            if not was_over and self.events.min_level <= INFO:
+                self.events.emit(INFO, 'game_over', self.clock.get_ticks(),
+                                 winner={"玩家": 'player', "电脑": 'computer'}.get(self.winner))
+
+    def computer_play(self):
+        """改进的电脑AI逻辑"""
+        if self.computer_state == "waiting":
+            self.computer_state = "aiming"
+            self.computer_ball.is_aiming = True
+            self.computer_aiming_time = 0
+
+            if self.planner is not None:
+                self.target_angle, self.target_power = self.planner.plan(self)
+                return
+
+            # 计算最佳射击角度和力量
+            target_x = self.player_ball.x
+            target_y = self.player_ball.y
+
+            # 检查是否有障碍物阻挡
+            dx = target_x - self.computer_ball.x
+            dy = target_y - self.computer_ball.y
+            distance = math.sqrt(dx*dx + dy*dy)
+
+            # 如果有障碍物，尝试寻找替代路径
+            has_obstacle = self.is_line_blocked(
+                self.computer_ball.x, self.computer_ball.y, target_x, target_y)
+
+            if has_obstacle:
+                # 寻找替代目标点
+                angles = [a for a in range(0, 360, 30)]  # 每30度检查一个方向
+                self.rng.shuffle(angles)  # 随机化方向
+                # 所有方向一次批量检测
+                test_xs = [self.computer_ball.x + math.cos(math.radians(angle)) * distance for angle in angles]
+                test_ys = [self.computer_ball.y + math.sin(math.radians(angle)) * distance for angle in angles]
+                blocked = self.line_of_sight.blocked(
+                    self.computer_ball.x, self.computer_ball.y, test_xs, test_ys)
+                for test_x, test_y, is_blocked in zip(test_xs, test_ys, blocked):
+                    if not is_blocked:
+                        target_x = test_x
+                        target_y = test_y
+                        break
+
+            # 计算最终角度和力量
+            dx = target_x - self.computer_ball.x
+            dy = target_y - self.computer_ball.y
+            self.target_angle = math.degrees(math.atan2(dy, dx))
+            self.target_power = min(
+                distance * 0.5,  # 根据距离调整力量
+                self.computer_ball.max_power
+            )
+
+        elif self.computer_state == "aiming":
+            # 平滑转向目标角度
+            angle_diff = (self.target_angle - self.computer_ball.angle) % 360
+            if angle_diff > 180:
+                angle_diff -= 360
+
+            if abs(angle_diff) > self.computer_ball.rotation_speed:
+                if angle_diff > 0:
+                    self.computer_ball.angle += self.computer_ball.rotation_speed
+                else:
+                    self.computer_ball.angle -= self.computer_ball.rotation_speed
+            else:
+                self.computer_ball.angle = self.target_angle
+                self.computer_aiming_time += 1
+
+            if self.computer_aiming_time >= 30:
+                self.computer_state = "power"
+                self.computer_ball.is_aiming = False
+                self.computer_ball.is_power_adjusting = True
+                self.computer_aiming_time = 0
+
+        elif self.computer_state == "power":
+            # 调整到目标力量
+            if abs(self.computer_ball.power - self.target_power) > POWER_CHANGE_SPEED:
+                if self.computer_ball.power < self.target_power:
+                    self.computer_ball.power += POWER_CHANGE_SPEED
+                else:
+                    self.computer_ball.power -= POWER_CHANGE_SPEED
+            else:
+                self.computer_ball.power = self.target_power
+                self.computer_state = "shooting"
+                self.computer_ball.shoot()
+
+    def is_line_blocked(self, x1, y1, x2, y2):
+        """线段是否被任一障碍物阻挡"""
+        return self.line_of_sight.is_blocked(x1, y1, x2, y2)
+
+    def press_space(self):
+        """处理空格键：重新开始 / 进入瞄准 / 调整力量 / 发射"""
+        if self.game_over:
+            self.reset_game()
+        elif self.current_turn == "player" and not self.player_ball.is_moving:
+            if not self.player_ball.is_aiming and not self.player_ball.is_power_adjusting:
+                self.player_ball.is_aiming = True
+            elif self.player_ball.is_aiming:
+                self.player_ball.is_aiming = False
+                self.player_ball.is_power_adjusting = True
+            elif self.player_ball.is_power_adjusting:
+                self.player_ball.shoot()
+
+    def update_player_controls(self):
+        """更新玩家的箭头旋转和力量"""
+        if self.player_ball.is_aiming:
+            self.player_ball.angle = (self.player_ball.angle + ROTATION_SPEED) % 360
+
+        if self.player_ball.is_power_adjusting:
+            if self.player_ball.power_increasing:
+                self.player_ball.power += POWER_CHANGE_SPEED
+                if self.player_ball.power >= ARROW_LENGTH_MAX:
+                    self.player_ball.power_increasing = False
+            else:
+                self.player_ball.power -= POWER_CHANGE_SPEED
+                if self.player_ball.power <= ARROW_LENGTH_MIN:
+                    self.player_ball.power_increasing = True
+
+    def update(self):
+        """推进一个模拟步"""
+        profiler = self.profiler
+        self.clock.tick()
+        self.update_player_controls()
+        with profiler.phase('update.balls'):
+            self.player_ball.update(self.collider)
+            self.computer_ball.update(self.collider)
+        with profiler.phase('update.rules'):
+            self.check_collision()
+            self.generate_power_up()
+
+            if not self.game_over:
+                # 处理回合转换
+                if self.current_turn == "player":
+                    if self.player_ball.turn_complete:
+                        self.current_turn = "computer"
+                        self.computer_state = "waiting"
+                        self.player_ball.turn_complete = False
+                        # 确保电脑球准备好下一回合
+                        self.computer_ball.is_moving = False
+                        self.computer_ball.turn_complete = False
+                        self.emit_turn_changed('turn_complete')
+                elif self.current_turn == "computer":
+                    if not self.computer_ball.is_moving:
+                        with profiler.phase('update.ai'):
+                            self.computer_play()
+                    if self.computer_ball.turn_complete:
+                        self.current_turn = "player"
+                        self.computer_ball.turn_complete = False
+                        # 确保玩家球准备好下一回合
+                        self.player_ball.is_moving = False
+                        self.player_ball.turn_complete = False
+                        self.emit_turn_changed('turn_complete')
+
+        # 检查与障碍物和道具的碰撞
+        with profiler.phase('update.collisions'):
+            moving = [ball for ball in (self.player_ball, self.computer_ball) if ball.is_moving]
+            if self.collider is None:
+                for ball in moving:
+                    self.check_obstacle_collisions(ball)
+            if moving:
+                self.check_power_up_collisions(moving)
+
+    def check_obstacle_collisions(self, ball):
+        """检查球与障碍物的碰撞"""
+        ball_rect = Rect(ball.x - ball.radius, ball.y - ball.radius,
+                         ball.radius * 2, ball.radius * 2)
+        for obstacle in self.obstacle_index.query_aabb(
+                ball_rect.left, ball_rect.top, ball_rect.right, ball_rect.bottom):
+            if ball_rect.colliderect(obstacle.rect):
+                # 确定碰撞方向并反弹
+                if ball.x < obstacle.rect.left or ball.x > obstacle.rect.right:
+                    ball.dx *= -1
+                if ball.y < obstacle.rect.top or ball.y > obstacle.rect.bottom:
+                    ball.dy *= -1
@@ -0,0 +1,114 @@
+# 模拟与渲染解耦：模拟按时钟的固定步长推进（默认在后台线程中），主线程只处理事件和绘制，
+# 绘制耗时不再拖慢模拟，渲染可以不限帧率或跟随显示器的垂直同步（120/144 Hz 也能用上）
+# 渲染落后模拟一步：绘制时按距上一步的墙钟时间比例，在最近两个模拟状态之间插值球的位置
+import contextlib
+import math
+import threading
+import time
+
+MAX_CATCH_UP_STEPS = 10  # 落后时一次最多补推进的步数，超过时放弃追赶，避免卡顿后长时间快进
+
+class SimulationLoop:
+    """按固定步长推进对局
+
+    step 为推进一步的函数（默认 game.update），finished 返回 True 时停止推进（回放结束）；
+    speed 为倍速，每步对应 1 / (tick_rate * speed) 秒墙钟时间。
+    start() 后由后台线程推进；不启动线程时由主循环每帧调用 advance()。
+    模拟状态只在持有 lock 时读写：推进、插值绘制和施加输入都要先获取 lock
+    """
+
+    def __init__(self, game, step=None, finished=None, speed=1.0):
+        self.game = game
+        self.step = step or game.update
+        self.is_finished = finished
+        self.interval = 1 / (game.clock.tick_rate * speed)  # 每步的墙钟秒数
+        self.lock = threading.Lock()
+        self.previous = []  # 最近一步之前各球的 (球, x, y, 可插值的最大位移)
+        self.next_time = None  # 下一步应当推进的墙钟时间
+        self.finished = False
+        self.steps = 0  # 已推进的步数
+        self.dropped = 0  # 放弃追赶而跳过的步数
+        self.thread = None
+        self.running = False
+
+    def capture(self):
+        """记录推进前球的位置，作为插值的起点"""
+        self.previous = []
+        for ball in (self.game.player_ball, self.game.computer_ball):
+            # 一步内的位移不超过速度（反弹不增加路程），半径变化时的夹紧再留出一个半径；
+            # 超过这个距离说明球被重置了位置，不做插值
+            limit = math.hypot(ball.dx, ball.dy) + ball.radius
+            self.previous.append((ball, ball.x, ball.y, limit))
+
+    def advance(self, now=None):
+        """推进到墙钟时间 now 应有的步数，返回本次推进的步数；调用方需持有 lock"""
+        if now is None:
+            now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        steps = 0
+        while not self.finished and now >= self.next_time:
+            if steps == MAX_CATCH_UP_STEPS:
+                self.dropped += int((now - self.next_time) / self.interval) + 1
+                self.next_time = now + self.interval
+                break
+            self.capture()
+            self.step()
+            self.steps += 1
+            steps += 1
+            self.next_time += self.interval
+            if self.is_finished is not None and self.is_finished():
+                self.finished = True
+        return steps
+
+    def alpha(self, now=None):
+        """当前渲染时刻在最近两个模拟状态之间的比例（0 为上一步之前，1 为最新状态）"""
+        if self.next_time is None:
+            return 1.0
+        if now is None:
+            now = time.perf_counter()
+        return min(1.0, max(0.0, 1 - (self.next_time - now) / self.interval))
+
+    @contextlib.contextmanager
+    def interpolated(self, now=None):
+        """持有 lock 并把球临时移到插值位置，用于绘制：with loop.interpolated(): game.draw(screen)"""
+        with self.lock:
+            alpha = self.alpha(now)
+            moved = []
+            current = (self.game.player_ball, self.game.computer_ball)
+            for ball, x, y, limit in self.previous:
+                # 重新开始后是新的球对象，不做插值
+                if ball in current and math.hypot(ball.x - x, ball.y - y) <= limit:
+                    moved.append((ball, ball.x, ball.y))
+                    ball.x = x + (ball.x - x) * alpha
+                    ball.y = y + (ball.y - y) * alpha
+            try:
+                yield alpha
+            finally:
+                for ball, x, y in moved:
+                    ball.x = x
+                    ball.y = y
+
+    def run(self):
+        """后台线程：推进到当前时间，然后睡到下一步"""
+        while self.running:
+            with self.lock:
+                self.advance()
+                if self.finished:
+                    break
+                delay = self.next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def start(self):
+        """启动后台模拟线程"""
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """停止后台线程并等待其结束"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
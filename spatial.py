@@ -0,0 +1,79 @@
+# 均匀网格空间索引：障碍物按包围盒登记到覆盖的网格中，
+# 碰撞检测只需检查附近格子里的候选对象（视线检测由 line_of_sight 一次检测全部障碍物）
+# 查询返回的是候选集合（包围盒相交，边界包含在内），精确判断由调用方完成；
+# 候选按插入顺序返回，与原先线性扫描列表的顺序一致
+import math
+
+class UniformGrid:
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> {item: None}
+        self.bounds = {}  # item -> (left, top, right, bottom)
+        self.order = {}  # item -> 插入序号
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __contains__(self, item):
+        return item in self.bounds
+
+    def cell_range(self, left, top, right, bottom):
+        """包围盒覆盖的格子范围（含边界）"""
+        size = self.cell_size
+        return (math.floor(left / size), math.floor(top / size),
+                math.floor(right / size), math.floor(bottom / size))
+
+    def insert(self, item, left, top, right, bottom):
+        """登记对象及其包围盒"""
+        if item in self.bounds:
+            self.remove(item)
+        self.bounds[item] = (left, top, right, bottom)
+        self.order[item] = self.counter
+        self.counter += 1
+        x0, y0, x1, y1 = self.cell_range(left, top, right, bottom)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), {})[item] = None
+
+    def remove(self, item):
+        """移除对象，不存在时忽略"""
+        bounds = self.bounds.pop(item, None)
+        if bounds is None:
+            return
+        del self.order[item]
+        x0, y0, x1, y1 = self.cell_range(*bounds)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is not None:
+                    cell.pop(item, None)
+                    if not cell:
+                        del self.cells[(cx, cy)]
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds.clear()
+        self.order.clear()
+        self.counter = 0
+
+    def _sorted(self, found):
+        return sorted(found, key=self.order.__getitem__)
+
+    def query_aabb(self, left, top, right, bottom):
+        """与给定包围盒相交的对象"""
+        found = {}
+        x0, y0, x1, y1 = self.cell_range(left, top, right, bottom)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells.get((cx, cy))
+                if not cell:
+                    continue
+                for item in cell:
+                    if item in found:
+                        continue
+                    item_left, item_top, item_right, item_bottom = self.bounds[item]
+                    if (item_left <= right and left <= item_right and
+                            item_top <= bottom and top <= item_bottom):
+                        found[item] = None
+        return self._sorted(found)
@@ -0,0 +1,44 @@
+# 最小堆定时器队列：效果到期、道具过期等按到期时间登记回调，时钟推进时只弹出已到期的项，
+# 没有到期项时每步只比较一次堆顶；取消的定时器留在堆中，到期时跳过
+import heapq
+import itertools
+
+class Timer:
+    __slots__ = ('when', 'callback', 'args', 'cancelled')
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimerQueue:
+    def __init__(self):
+        self.heap = []  # (到期时间, 登记序号, Timer)
+        self.counter = itertools.count()  # 同一时刻到期的定时器按登记顺序触发
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, when, callback, *args):
+        """在时间 when（毫秒）到达时调用 callback(*args)，返回可取消的 Timer"""
+        timer = Timer(when, callback, args)
+        heapq.heappush(self.heap, (when, next(self.counter), timer))
+        return timer
+
+    def run(self, now):
+        """触发到期时间不晚于 now 的全部回调，返回触发的个数；回调中登记的已到期定时器也会触发"""
+        heap = self.heap
+        fired = 0
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+                fired += 1
+        return fired
+
+    def clear(self):
+        self.heap.clear()
@@ -0,0 +1,282 @@
+# 电脑对电脑的锦标赛：按难度组合、障碍物数量、道具生成频率扫描，每种设置各打若干局，
+# 每局使用独立的随机种子，在进程池中并行运行；结果逐局流回主进程，最后汇总胜率及其置信区间
+#
+#   python tournament.py                                   默认扫描，每种设置 100 局
+#   python tournament.py -n 1000 --players easy,hard       指定局数和参赛者
+#   python tournament.py -o results.jsonl --summary s.json 逐局结果写入 JSON Lines，汇总写入 JSON
+#
+# 参赛者有两类：easy / normal / hard 为 simulation.AI 的对应难度（AI.calculate_shot，朝对手直接击球），
+# planner-easy / planner-normal / planner-hard 为 planner.ShotPlanner 的对应难度（搜索不设时间预算、
+# 只按采样数评估，结果与机器速度无关）。电脑一侧走 Game.computer_play（瞄准、调整力量的动画与正常对局相同），
+# 玩家一侧在轮到它时直接发射。同一种子总能复现同一局；玩家总是先手，每种组合的两种座位各打一半的局
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+import simulation
+from game_clock import GameClock
+from planner import DIFFICULTY, ShotPlanner
+
+PLANNER_PREFIX = 'planner-'
+PLAYERS = tuple(DIFFICULTY) + tuple(PLANNER_PREFIX + difficulty for difficulty in DIFFICULTY)
+DEFAULT_PLAYERS = ('easy', 'normal', 'hard', 'planner-normal')
+
+# 道具生成间隔（毫秒）的范围，与 Game 的 powerup_interval 参数对应
+POWER_UP_RATES = {
+    'none': (10 ** 9, 10 ** 9),
+    'low': (10000, 20000),
+    'normal': (5000, 10000),
+    'high': (1000, 3000),
+}
+DEFAULT_OBSTACLES = (0, 5, 10)
+DEFAULT_RATES = ('low', 'normal', 'high')
+MAX_FRAMES = 60 * 60 * 10  # 超过该步数（默认 10 分钟）仍未分出胜负记为平局
+Z_95 = 1.959964  # 95% 置信区间的正态分位数
+
+class TournamentGame(simulation.Game):
+    """记录每一侧收集的道具数"""
+
+    def __init__(self, *args, **kwargs):
+        self.power_ups_collected = {'player': 0, 'computer': 0}
+        super().__init__(*args, **kwargs)
+
+    def pick_up_power_up(self, ball, index):
+        super().pick_up_power_up(ball, index)
+        side = 'player' if ball is self.player_ball else 'computer'
+        self.power_ups_collected[side] += 1
+
+class AIShooter:
+    """把 simulation.AI 包装成与 ShotPlanner.plan 相同的接口，供 Game.computer_play 使用"""
+
+    def __init__(self, difficulty, seed=None):
+        self.ai = simulation.AI(random.Random(seed))
+        self.ai.difficulty = difficulty
+
+    def plan(self, game, ball=None, target=None):
+        ball = ball or game.computer_ball
+        target = target or game.player_ball
+        return self.ai.calculate_shot(ball, target)
+
+def make_player(name, seed):
+    """按参赛者名字创建击球策略"""
+    if name.startswith(PLANNER_PREFIX):
+        return ShotPlanner(name[len(PLANNER_PREFIX):], time_budget=math.inf, workers=0, seed=seed)
+    return AIShooter(name, seed)
+
+def wilson_interval(wins, n, z=Z_95):
+    """二项比例的 Wilson 置信区间 (下限, 上限)"""
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def make_specs(matches, players, obstacle_counts, rates, base_seed=0, max_frames=MAX_FRAMES):
+    """生成全部对局的设置；同一设置的对局轮流交换座位，种子在整个锦标赛内唯一"""
+    specs = []
+    seed = base_seed
+    for first, second in itertools.combinations_with_replacement(players, 2):
+        for obstacles in obstacle_counts:
+            for rate in rates:
+                for i in range(matches):
+                    player, computer = (first, second) if i % 2 == 0 else (second, first)
+                    specs.append({
+                        'config': (first, second, obstacles, rate),
+                        'first_side': 'player' if i % 2 == 0 else 'computer',  # first 所在的一侧
+                        'player': player,
+                        'computer': computer,
+                        'obstacles': obstacles,
+                        'rate': rate,
+                        'seed': seed,
+                        'max_frames': max_frames,
+                    })
+                    seed += 1
+    return specs
+
+def run_match(spec):
+    """在当前进程中打完一局，返回结果；在工作进程中运行"""
+    seed = spec['seed']
+    # 每一侧使用由对局种子派生的独立随机数
+    player = make_player(spec['player'], seed * 2)
+    computer = make_player(spec['computer'], seed * 2 + 1)
+    turns = 1
+    game = TournamentGame(clock=GameClock(), planner=computer, rng=random.Random(seed),
+                          obstacle_count=spec['obstacles'], powerup_interval=POWER_UP_RATES[spec['rate']])
+    ball = game.player_ball
+    while not game.game_over and game.clock.frame < spec['max_frames']:
+        if (game.current_turn == 'player' and not ball.is_moving and not ball.turn_complete):
+            ball.angle, ball.power = player.plan(game, ball, game.computer_ball)
+            ball.shoot()
+        turn = game.current_turn
+        game.update()
+        if game.current_turn != turn:
+            turns += 1
+
+    if game.winner == '玩家':
+        winner = spec['player']
+        side = 'player'
+    elif game.winner == '电脑':
+        winner = spec['computer']
+        side = 'computer'
+    else:
+        winner = side = None
+    return {
+        'config': spec['config'],
+        'first_side': spec['first_side'],
+        'seed': seed,
+        'player': spec['player'],
+        'computer': spec['computer'],
+        'obstacles': spec['obstacles'],
+        'rate': spec['rate'],
+        'winner': winner,  # 获胜的参赛者，平局为 None
+        'winner_side': side,
+        'turns': turns,
+        'frames': game.clock.frame,
+        'power_ups': dict(game.power_ups_collected),
+    }
+
+def run_tournament(specs, workers=None, chunksize=None):
+    """在进程池中运行全部对局，按完成顺序逐局产出结果；workers 为 0 时在当前进程中运行"""
+    if workers == 0:
+        for spec in specs:
+            yield run_match(spec)
+        return
+    workers = workers or multiprocessing.cpu_count()
+    if chunksize is None:
+        # 每个工作进程大约分到 8 块：块足够大以摊薄进程间通信，又足够多以平衡各局长短不一的耗时
+        chunksize = max(1, len(specs) // (workers * 8))
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(run_match, specs, chunksize)
+
+class Summary:
+    """一种设置的汇总；first、second 为该设置的两名参赛者"""
+
+    def __init__(self, config):
+        self.first, self.second, self.obstacles, self.rate = config
+        self.matches = 0
+        self.first_wins = 0
+        self.second_wins = 0
+        self.draws = 0
+        self.player_wins = 0  # 先手获胜的局数
+        self.turns = 0
+        self.frames = 0
+        self.power_ups = 0
+
+    def add(self, result):
+        self.matches += 1
+        # 按座位而不是名字区分两侧，两侧是同一参赛者时也能统计
+        if result['winner_side'] is None:
+            self.draws += 1
+        else:
+            if result['winner_side'] == result['first_side']:
+                self.first_wins += 1
+            else:
+                self.second_wins += 1
+            if result['winner_side'] == 'player':
+                self.player_wins += 1
+        self.turns += result['turns']
+        self.frames += result['frames']
+        self.power_ups += sum(result['power_ups'].values())
+
+    def to_dict(self):
+        low, high = wilson_interval(self.first_wins, self.matches)
+        player_low, player_high = wilson_interval(self.player_wins, self.matches)
+        matches = max(self.matches, 1)
+        return {
+            'first': self.first,
+            'second': self.second,
+            'obstacles': self.obstacles,
+            'rate': self.rate,
+            'matches': self.matches,
+            'first_wins': self.first_wins,
+            'second_wins': self.second_wins,
+            'draws': self.draws,
+            'first_win_rate': self.first_wins / matches,
+            'first_win_rate_ci95': [low, high],
+            'player_win_rate': self.player_wins / matches,
+            'player_win_rate_ci95': [player_low, player_high],
+            'mean_turns': self.turns / matches,
+            'mean_frames': self.frames / matches,
+            'mean_power_ups': self.power_ups / matches,
+        }
+
+def aggregate(summaries, result):
+    """把一局结果加入 {设置: Summary}"""
+    config = tuple(result['config'])
+    if config not in summaries:
+        summaries[config] = Summary(config)
+    summaries[config].add(result)
+
+def print_report(summaries):
+    print(f"{'对阵':<30}{'障碍':>5}{'道具':>8}{'局数':>7}{'胜率 (95% CI)':>26}{'平局':>6}"
+          f"{'先手胜率':>10}{'回合':>8}{'步数':>9}{'道具数':>7}")
+    for config in sorted(summaries, key=lambda c: (c[0], c[1], c[2], c[3])):
+        s = summaries[config].to_dict()
+        low, high = s['first_win_rate_ci95']
+        print(f"{s['first'] + ' vs ' + s['second']:<30}{s['obstacles']:>5}{s['rate']:>8}{s['matches']:>7}"
+              f"{s['first_win_rate']:>12.1%} [{low:.1%}, {high:.1%}]{s['draws']:>6}"
+              f"{s['player_win_rate']:>10.1%}{s['mean_turns']:>8.1f}{s['mean_frames']:>9.0f}"
+              f"{s['mean_power_ups']:>7.2f}")
+
+def parse_list(text, convert=str):
+    return [convert(item) for item in text.split(',') if item]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电脑对电脑锦标赛")
+    parser.add_argument('-n', '--matches', type=int, default=100, help="每种设置的局数")
+    parser.add_argument('--players', default=','.join(DEFAULT_PLAYERS),
+                        help=f"参赛者，逗号分隔，可选 {', '.join(PLAYERS)}")
+    parser.add_argument('--obstacles', default=','.join(map(str, DEFAULT_OBSTACLES)), help="障碍物数量，逗号分隔")
+    parser.add_argument('--rates', default=','.join(DEFAULT_RATES),
+                        help=f"道具生成频率，逗号分隔，可选 {', '.join(POWER_UP_RATES)}")
+    parser.add_argument('--seed', type=int, default=0, help="第一局的随机种子，其余各局依次加 1")
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES, help="每局的最大步数，超过记为平局")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="工作进程数，默认使用全部核，0 表示不使用进程池")
+    parser.add_argument('-o', '--output', help="逐局结果写入的 JSON Lines 文件")
+    parser.add_argument('--summary', help="汇总结果写入的 JSON 文件")
+    args = parser.parse_args(argv)
+
+    players = parse_list(args.players)
+    rates = parse_list(args.rates)
+    for player in players:
+        if player not in PLAYERS:
+            parser.error(f"未知参赛者: {player}")
+    for rate in rates:
+        if rate not in POWER_UP_RATES:
+            parser.error(f"未知道具频率: {rate}")
+    specs = make_specs(args.matches, players, parse_list(args.obstacles, int), rates,
+                       args.seed, args.max_frames)
+
+    start = time.perf_counter()
+    summaries = {}
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for done, result in enumerate(run_tournament(specs, args.workers), 1):
+            aggregate(summaries, result)
+            if output is not None:
+                output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            if done % 100 == 0 or done == len(specs):
+                elapsed = time.perf_counter() - start
+                print(f"\r已完成 {done}/{len(specs)} 局，{done / max(elapsed, 1e-9):.1f} 局/秒",
+                      end='', file=sys.stderr, flush=True)
+    finally:
+        if output is not None:
+            output.close()
+    print(file=sys.stderr)
+
+    print_report(summaries)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump([summaries[config].to_dict() for config in sorted(summaries)], f,
+                      indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
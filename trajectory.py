@@ -0,0 +1,111 @@
+# 闭式轨迹预测：每帧 位置 += 速度、速度 *= FRICTION，两个速度分量都低于 STOP_SPEED 时停止，
+# 因此停止帧数和总位移都有解析解，不需要逐帧推进
+#   第 k 帧后速度为 v·F^k，停止帧数为使 max(|vx|, |vy|)·F^k < STOP_SPEED 的最小 k
+#   前 k 帧的总位移为 v·(1 - F^k) / (1 - F)
+# 与边界、障碍物的反射只改变方向不改变路程，由 collision.SweptCollider 沿总位移一次扫掠得到；
+# 与轴对齐表面的反射不改变 |vx|、|vy|，停止帧数保持精确，只有撞到障碍物的角时是近似值
+import math
+
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, FRICTION
+from spatial import UniformGrid
+from collision import SweptCollider
+
+STOP_SPEED = 0.1  # 两个速度分量都低于该值时球停止
+
+def stop_frames(dx, dy):
+    """以速度 (dx, dy) 出发到停止经过的帧数（停止判定在第 k 帧施加摩擦之后）"""
+    speed = max(abs(dx), abs(dy))
+    if speed * FRICTION < STOP_SPEED:
+        return 1
+    k = math.ceil(math.log(STOP_SPEED / speed) / math.log(FRICTION))
+    # 对数的舍入误差可能使 k 偏差一帧，按停止条件修正
+    while speed * FRICTION ** k >= STOP_SPEED:
+        k += 1
+    while k > 1 and speed * FRICTION ** (k - 1) < STOP_SPEED:
+        k -= 1
+    return k
+
+def travel_scale(frames):
+    """前 frames 帧的总位移与初速度之比：1 + F + F^2 + ... + F^(frames-1)"""
+    return (1 - FRICTION ** frames) / (1 - FRICTION)
+
+def shot_reach(power):
+    """以力量 power 击球（Ball.shoot 的初速度为 power / 10）不受阻挡时滑行的距离"""
+    speed = power / 10
+    return speed * travel_scale(stop_frames(speed, 0))
+
+class Trajectory:
+    def __init__(self, points, frames, end_dx, end_dy, stopped, normals=()):
+        self.points = points  # 起点、各反弹点和终点
+        self.normals = normals  # 各反弹处表面的单位外法线，与 points[1:-1] 一一对应
+        self.frames = frames  # 经过的帧数
+        self.end_dx = end_dx  # 终点处的速度
+        self.end_dy = end_dy
+        self.stopped = stopped  # 是否在终点停止
+
+    @property
+    def start(self):
+        return self.points[0]
+
+    @property
+    def end(self):
+        return self.points[-1]
+
+    @property
+    def reflections(self):
+        """与边界、障碍物的各次反弹 [((x, y), (nx, ny)), ...]：反弹点和表面的外法线"""
+        return list(zip(self.points[1:-1], self.normals))
+
+    @property
+    def segments(self):
+        """折线的各段 [((x1, y1), (x2, y2)), ...]"""
+        return list(zip(self.points, self.points[1:]))
+
+    def closest_approach(self, x, y):
+        """轨迹上离点 (x, y) 最近的距离"""
+        best = math.hypot(x - self.start[0], y - self.start[1])
+        for (x1, y1), (x2, y2) in self.segments:
+            seg_x = x2 - x1
+            seg_y = y2 - y1
+            length_sq = seg_x * seg_x + seg_y * seg_y
+            t = 0.0
+            if length_sq > 0:
+                t = min(1.0, max(0.0, ((x - x1) * seg_x + (y - y1) * seg_y) / length_sq))
+            best = min(best, math.hypot(x - (x1 + seg_x * t), y - (y1 + seg_y * t)))
+        return best
+
+def wall_collider():
+    """只有窗口边界、没有障碍物的碰撞器"""
+    return SweptCollider(UniformGrid(), WINDOW_WIDTH, WINDOW_HEIGHT)
+
+def predict(x, y, dx, dy, radius, collider=None, max_frames=None):
+    """预测球从 (x, y) 以速度 (dx, dy) 出发的轨迹
+
+    collider 为 None 时只考虑窗口边界；max_frames 限制预测的帧数，None 表示一直到停止
+    """
+    if collider is None:
+        collider = wall_collider()
+    if dx == 0 and dy == 0:
+        return Trajectory([(x, y)], 0, 0, 0, True)
+
+    frames = stop_frames(dx, dy)
+    stopped = max_frames is None or frames <= max_frames
+    if not stopped:
+        frames = max_frames
+
+    x, y, dx, dy = collider.resolve_penetration(x, y, dx, dy, radius)
+    start = (x, y)
+    normals = []
+    x, y, dx, dy, bounces = collider.sweep(x, y, dx, dy, radius, travel_scale(frames), normals)
+    if stopped:
+        dx = dy = 0
+    else:
+        dx *= FRICTION ** frames
+        dy *= FRICTION ** frames
+    return Trajectory([start] + bounces + [(x, y)], frames, dx, dy, stopped, normals)
+
+def predict_shot(x, y, angle, power, radius, collider=None, max_frames=None):
+    """按 Ball.shoot 的方式由角度和力量计算初速度，再预测轨迹"""
+    dx = math.cos(math.radians(angle)) * (power / 10)
+    dy = math.sin(math.radians(angle)) * (power / 10)
+    return predict(x, y, dx, dy, radius, collider, max_frames)